@@ -6,8 +6,24 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, Event
 from homeassistant.const import CONF_MAC, EVENT_HOMEASSISTANT_STOP, Platform
 
-from .const import DOMAIN, CONF_RESET, CONF_DELAY
+from .const import (
+    DOMAIN,
+    CONF_RESET,
+    CONF_DELAY,
+    CONF_ON_DEMAND,
+    CONF_IDLE_TIMEOUT,
+    CONF_LATENCY_PROBE,
+    CONF_RESEND_INTERVAL,
+    CONF_RECONCILE_INTERVAL,
+    CONF_ZONE_MEMBERS,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_RESEND_INTERVAL,
+    DEFAULT_RECONCILE_INTERVAL,
+)
 from .elkbledom import BLEDOMInstance
+from .services import async_setup_services
+from .storage import async_get_state_store
+from .zone import MELKLEDZone
 
 LOGGER = logging.getLogger(__name__)
 
@@ -16,28 +32,62 @@ PLATFORMS: list[Platform] = [
     Platform.NUMBER,
     Platform.SWITCH,
     Platform.SELECT,
+    Platform.SENSOR,
 ]
+# У зоны есть только групповая сущность света
+ZONE_PLATFORMS: list[Platform] = [Platform.LIGHT]
+
+
+def _is_zone(entry: ConfigEntry) -> bool:
+    return CONF_ZONE_MEMBERS in entry.data
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MELK LED Strip from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    if _is_zone(entry):
+        return await _async_setup_zone_entry(hass, entry)
+
     # Получаем параметры
     reset = entry.options.get(CONF_RESET, entry.data.get(CONF_RESET, False))
     delay = entry.options.get(CONF_DELAY, entry.data.get(CONF_DELAY, 120))
+    on_demand = entry.options.get(CONF_ON_DEMAND, False)
+    idle_timeout = entry.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT)
+    latency_probe = entry.options.get(CONF_LATENCY_PROBE, False)
+    resend_interval = entry.options.get(CONF_RESEND_INTERVAL, DEFAULT_RESEND_INTERVAL)
+    reconcile_interval = entry.options.get(CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL)
     mac = entry.data.get(CONF_MAC) or entry.options.get(CONF_MAC)
 
     if not mac:
         LOGGER.error("MELK LED: MAC address missing in entry %s", entry.entry_id)
         return False
 
-    LOGGER.info("Initializing MELK LED: MAC=%s | reset=%s | delay=%s", mac, reset, delay)
+    LOGGER.debug(
+        "Initializing MELK LED: MAC=%s | reset=%s | delay=%s | on_demand=%s",
+        mac, reset, delay, on_demand,
+    )
+
+    # Общее состояние всех устройств читается один раз за запуск HA
+    await async_get_state_store(hass).async_load()
 
     # Создаем экземпляр устройства
-    instance = BLEDOMInstance(mac, reset, delay, hass)
+    instance = BLEDOMInstance(
+        mac,
+        reset,
+        delay,
+        hass,
+        on_demand=on_demand,
+        idle_timeout=idle_timeout,
+        latency_probe=latency_probe,
+        resend_interval=resend_interval,
+        reconcile_interval=reconcile_interval,
+    )
     hass.data[DOMAIN][entry.entry_id] = instance
 
+    # Сервисы интеграции (регистрируются один раз)
+    async_setup_services(hass)
+
     # Регистрируем платформы
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -57,13 +107,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_setup_zone_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a zone that drives several strips as one light."""
+    members = entry.options.get(CONF_ZONE_MEMBERS, entry.data[CONF_ZONE_MEMBERS])
+    LOGGER.debug("Initializing MELK LED zone %s with %d strip(s)", entry.title, len(members))
+
+    hass.data[DOMAIN][entry.entry_id] = MELKLEDZone(hass, entry.data["name"], members)
+    async_setup_services(hass)
+    await hass.config_entries.async_forward_entry_setups(entry, ZONE_PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    return True
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    LOGGER.info("Unloading MELK LED: %s", entry.entry_id)
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    LOGGER.debug("Unloading MELK LED: %s", entry.entry_id)
+    platforms = ZONE_PLATFORMS if _is_zone(entry) else PLATFORMS
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
     if unload_ok:
-        instance: BLEDOMInstance = hass.data[DOMAIN].pop(entry.entry_id, None)
-        if instance:
+        instance = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if isinstance(instance, BLEDOMInstance):
             await instance.stop()
     return unload_ok
 
@@ -0,0 +1,214 @@
+"""Host-side animation engine for MELK LED Strip transitions."""
+from __future__ import annotations
+
+import asyncio
+import colorsys
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_ANIMATOR
+
+if TYPE_CHECKING:
+    from .elkbledom import BLEDOMInstance
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FPS = 20
+
+MODE_FADE = "fade"
+MODE_SUNRISE = "sunrise"
+MODE_HSV_SWEEP = "hsv_sweep"
+MODES = (MODE_FADE, MODE_SUNRISE, MODE_HSV_SWEEP)
+
+# Опорные цвета рассвета: ночь -> тёмно-красный -> оранжевый -> тёплый белый
+SUNRISE_PALETTE: tuple[tuple[float, tuple[int, int, int]], ...] = (
+    (0.0, (0, 0, 0)),
+    (0.25, (90, 5, 0)),
+    (0.55, (255, 80, 0)),
+    (0.8, (255, 160, 60)),
+    (1.0, (255, 210, 140)),
+)
+
+
+@dataclass
+class Animation:
+    """One running transition of one strip."""
+
+    instance: BLEDOMInstance
+    mode: str
+    duration: float
+    start_rgb: tuple[int, int, int]
+    end_rgb: tuple[int, int, int]
+    start_brightness: int
+    end_brightness: int
+    # Что применить по окончании: аргументы apply_state()
+    final_state: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+    done: asyncio.Future | None = None
+
+
+def _lerp_rgb(a: tuple[int, int, int], b: tuple[int, int, int], t: float) -> tuple[float, float, float]:
+    return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, a[2] + (b[2] - a[2]) * t)
+
+
+def _sunrise_rgb(t: float) -> tuple[float, float, float]:
+    for (t0, c0), (t1, c1) in zip(SUNRISE_PALETTE, SUNRISE_PALETTE[1:]):
+        if t <= t1:
+            return _lerp_rgb(c0, c1, (t - t0) / (t1 - t0))
+    return SUNRISE_PALETTE[-1][1]
+
+
+def render(animations: list[Animation], now: float) -> list[tuple[int, int, int]]:
+    """Compute the current frame of every animation in one pass.
+
+    Progress, brightness and color are computed column-wise for the whole
+    batch, so a tick costs one pass over the active strips.
+    """
+    progress = [min(1.0, (now - a.started) / a.duration) if a.duration > 0 else 1.0 for a in animations]
+    levels = [
+        (a.start_brightness + (a.end_brightness - a.start_brightness) * t) / 255
+        for a, t in zip(animations, progress)
+    ]
+    colors: list[tuple[float, float, float]] = []
+    for a, t in zip(animations, progress):
+        if a.mode == MODE_SUNRISE:
+            colors.append(_sunrise_rgb(t))
+        elif a.mode == MODE_HSV_SWEEP:
+            r, g, b = colorsys.hsv_to_rgb(t % 1.0, 1.0, 1.0)
+            colors.append((r * 255, g * 255, b * 255))
+        else:
+            colors.append(_lerp_rgb(a.start_rgb, a.end_rgb, t))
+    return [
+        (round(r * level), round(g * level), round(b * level))
+        for (r, g, b), level in zip(colors, levels)
+    ]
+
+
+class MELKLEDAnimator:
+    """Render transitions for all strips in one loop at a target frame rate."""
+
+    def __init__(self, hass: HomeAssistant, fps: int = DEFAULT_FPS) -> None:
+        self._hass = hass
+        self._interval = 1 / fps
+        self._animations: dict[str, Animation] = {}
+        self._task: asyncio.Task | None = None
+        self._fps = 0.0
+
+    @property
+    def fps(self) -> float:
+        """Achieved loop rate (ticks per second, smoothed)."""
+        return round(self._fps, 1) if self._animations else 0.0
+
+    @property
+    def active(self) -> int:
+        return len(self._animations)
+
+    @callback
+    def async_start(self, animation: Animation) -> asyncio.Future:
+        """Start (or replace) the animation of a strip."""
+        self.async_cancel(animation.instance)
+        animation.done = asyncio.get_running_loop().create_future()
+        self._animations[animation.instance.address] = animation
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._async_run())
+        return animation.done
+
+    @callback
+    def async_cancel(self, instance: BLEDOMInstance) -> None:
+        """Stop the animation of a strip; a newer command takes over."""
+        animation = self._animations.pop(instance.address, None)
+        if animation and animation.done and not animation.done.done():
+            animation.done.cancel()
+
+    async def _async_run(self) -> None:
+        last_tick: float | None = None
+        self._fps = 0.0
+        while self._animations:
+            now = time.monotonic()
+            if last_tick is not None and now > last_tick:
+                # Сглаженная частота кадров
+                rate = 1 / (now - last_tick)
+                self._fps = self._fps * 0.8 + rate * 0.2 if self._fps else rate
+            last_tick = now
+
+            animations = list(self._animations.values())
+            for animation, rgb in zip(animations, render(animations, now)):
+                # Если ссылка не успевает, stream_color заменит неотправленный кадр
+                animation.instance.stream_color(rgb)
+
+            for animation in animations:
+                if now - animation.started >= animation.duration:
+                    self._animations.pop(animation.instance.address, None)
+                    self._hass.async_create_task(self._async_finish(animation))
+
+            await asyncio.sleep(max(0.0, self._interval - (time.monotonic() - now)))
+
+    async def _async_finish(self, animation: Animation) -> None:
+        """Apply the final state once the last frame is rendered."""
+        if animation.instance.address in self._animations:
+            # Переход уже заменён новым - его конечное состояние не нужно
+            if animation.done and not animation.done.done():
+                animation.done.cancel()
+            return
+        try:
+            await animation.instance.apply_state(**animation.final_state)
+        except Exception as err:  # noqa: BLE001
+            LOGGER.warning("%s: failed to apply final animation state: %s", animation.instance.name, err)
+        if animation.done and not animation.done.done():
+            animation.done.set_result(None)
+
+
+@callback
+def async_get_animator(hass: HomeAssistant) -> MELKLEDAnimator:
+    """Return the integration-wide animator."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_ANIMATOR not in domain_data:
+        domain_data[DATA_ANIMATOR] = MELKLEDAnimator(hass)
+    return domain_data[DATA_ANIMATOR]
+
+
+@callback
+def async_animate(
+    hass: HomeAssistant,
+    instance: BLEDOMInstance,
+    mode: str,
+    duration: float,
+    rgb: tuple[int, int, int] | None = None,
+    brightness: int | None = None,
+    turn_off: bool = False,
+) -> asyncio.Future:
+    """Start a transition from the strip's current state.
+
+    fade goes to rgb/brightness (or to black when turn_off is set),
+    sunrise ramps from dark through warm colors, hsv_sweep cycles the hue.
+    """
+    start_rgb = instance.rgb_color
+    start_brightness = instance.brightness if instance.is_on else 0
+    end_rgb = tuple(rgb) if rgb is not None else start_rgb
+    end_brightness = instance.brightness if brightness is None else brightness
+    if mode == MODE_SUNRISE:
+        start_brightness = 0
+        end_rgb = tuple(rgb) if rgb is not None else SUNRISE_PALETTE[-1][1]
+
+    if turn_off:
+        final_state = {"power": False}
+        end_brightness = 0
+    else:
+        final_state = {"power": True, "rgb": end_rgb, "brightness": end_brightness or 1}
+
+    return async_get_animator(hass).async_start(
+        Animation(
+            instance=instance,
+            mode=mode,
+            duration=max(0.0, duration),
+            start_rgb=start_rgb,
+            end_rgb=end_rgb,  # type: ignore[arg-type]
+            start_brightness=start_brightness,
+            end_brightness=end_brightness,
+            final_state=final_state,
+        )
+    )
@@ -12,16 +12,37 @@ from homeassistant.components.bluetooth import (
     async_ble_device_from_address,
 )
 import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.device_registry import format_mac
+from homeassistant.util import slugify
 
 from .const import (
     DOMAIN,
     CONF_RESET,
     CONF_DELAY,
+    CONF_ON_DEMAND,
+    CONF_IDLE_TIMEOUT,
+    CONF_LATENCY_PROBE,
+    CONF_RESEND_INTERVAL,
+    CONF_RECONCILE_INTERVAL,
+    CONF_ZONE_MEMBERS,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_RESEND_INTERVAL,
+    DEFAULT_RECONCILE_INTERVAL,
 )
 
 LOGGER = logging.getLogger(__name__)
 MANUAL_MAC = "manual"
+ZONE = "zone"
+
+
+def _configured_strips(hass) -> dict[str, str]:
+    """MAC -> title of every configured strip (zones excluded)."""
+    return {
+        entry.data[CONF_MAC]: entry.title
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if CONF_ZONE_MEMBERS not in entry.data and CONF_MAC in entry.data
+    }
 
 
 class MELKLEDFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -85,6 +106,8 @@ class MELKLEDFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             if user_input[CONF_MAC] == MANUAL_MAC:
                 return await self.async_step_manual()
+            if user_input[CONF_MAC] == ZONE:
+                return await self.async_step_zone()
 
             self.mac = user_input[CONF_MAC]
             self.name = user_input["name"]
@@ -108,11 +131,14 @@ class MELKLEDFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             if d.name and any(x in d.name.upper() for x in ["ELK", "LED", "MELK"]):
                 self._discovered_devices.append({"address": d.address, "name": d.name})
 
-        if not self._discovered_devices:
+        has_strips = bool(_configured_strips(self.hass))
+        if not self._discovered_devices and not has_strips:
             return await self.async_step_manual()
 
         mac_dict = {dev["address"]: dev["name"] for dev in self._discovered_devices}
         mac_dict[MANUAL_MAC] = "Manually add MAC address"
+        if has_strips:
+            mac_dict[ZONE] = "Create a zone from configured strips"
 
         return self.async_show_form(
             step_id="user",
@@ -177,6 +203,38 @@ class MELKLEDFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors={},
         )
 
+    # =========================================================
+    # Зона из нескольких лент
+    # =========================================================
+    async def async_step_zone(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Create a zone light that drives several strips at once."""
+        errors: dict[str, str] = {}
+        strips = _configured_strips(self.hass)
+
+        if user_input is not None and user_input.get(CONF_ZONE_MEMBERS):
+            name = user_input["name"]
+            await self.async_set_unique_id(f"{ZONE}_{slugify(name)}")
+            self._abort_if_unique_id_configured()
+            return self.async_create_entry(
+                title=name,
+                data={"name": name, CONF_ZONE_MEMBERS: user_input[CONF_ZONE_MEMBERS]},
+            )
+        if user_input is not None:
+            errors[CONF_ZONE_MEMBERS] = "no_members"
+
+        return self.async_show_form(
+            step_id="zone",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("name"): str,
+                    vol.Required(CONF_ZONE_MEMBERS): cv.multi_select(strips),
+                }
+            ),
+            errors=errors,
+        )
+
     # =========================================================
     # Опции интеграции
     # =========================================================
@@ -199,14 +257,43 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, _user_input=None):
         """Initial step."""
+        if CONF_ZONE_MEMBERS in self._config_entry.data:
+            return await self.async_step_zone()
         return await self.async_step_user()
 
+    async def async_step_zone(self, user_input=None):
+        """Zone options: member strips."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title="", data={CONF_ZONE_MEMBERS: user_input[CONF_ZONE_MEMBERS]}
+            )
+
+        members = self._config_entry.options.get(
+            CONF_ZONE_MEMBERS, self._config_entry.data[CONF_ZONE_MEMBERS]
+        )
+        return self.async_show_form(
+            step_id="zone",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ZONE_MEMBERS, default=members): cv.multi_select(
+                        _configured_strips(self.hass)
+                    ),
+                }
+            ),
+        )
+
     async def async_step_user(self, user_input=None):
         """Main options screen."""
         errors = {}
-        options = self._config_entry.options or {
+        options = {
             CONF_RESET: False,
             CONF_DELAY: 0,
+            CONF_ON_DEMAND: False,
+            CONF_IDLE_TIMEOUT: DEFAULT_IDLE_TIMEOUT,
+            CONF_LATENCY_PROBE: False,
+            CONF_RESEND_INTERVAL: DEFAULT_RESEND_INTERVAL,
+            CONF_RECONCILE_INTERVAL: DEFAULT_RECONCILE_INTERVAL,
+            **self._config_entry.options,
         }
 
         if user_input is not None:
@@ -215,6 +302,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 data={
                     CONF_RESET: user_input[CONF_RESET],
                     CONF_DELAY: user_input[CONF_DELAY],
+                    CONF_ON_DEMAND: user_input[CONF_ON_DEMAND],
+                    CONF_IDLE_TIMEOUT: user_input[CONF_IDLE_TIMEOUT],
+                    CONF_LATENCY_PROBE: user_input[CONF_LATENCY_PROBE],
+                    CONF_RESEND_INTERVAL: user_input[CONF_RESEND_INTERVAL],
+                    CONF_RECONCILE_INTERVAL: user_input[CONF_RECONCILE_INTERVAL],
                 },
             )
 
@@ -224,6 +316,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 {
                     vol.Optional(CONF_RESET, default=options.get(CONF_RESET)): bool,
                     vol.Optional(CONF_DELAY, default=options.get(CONF_DELAY)): int,
+                    vol.Optional(CONF_ON_DEMAND, default=options.get(CONF_ON_DEMAND)): bool,
+                    vol.Optional(
+                        CONF_IDLE_TIMEOUT, default=options.get(CONF_IDLE_TIMEOUT)
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_LATENCY_PROBE, default=options.get(CONF_LATENCY_PROBE)
+                    ): bool,
+                    vol.Optional(
+                        CONF_RESEND_INTERVAL, default=options.get(CONF_RESEND_INTERVAL)
+                    ): vol.All(int, vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_RECONCILE_INTERVAL, default=options.get(CONF_RECONCILE_INTERVAL)
+                    ): vol.All(int, vol.Range(min=0)),
                 }
             ),
             errors=errors,
@@ -0,0 +1,110 @@
+"""Shared BLE connection scheduling for MELK LED Strip devices."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_CONNECTION_MANAGER
+
+LOGGER = logging.getLogger(__name__)
+
+# Одновременных попыток подключения на один адаптер/прокси
+MAX_CONNECTS_PER_SOURCE = 2
+
+# Меньше - раньше: устройства с командами в очереди подключаются первыми
+PRIORITY_COMMAND = 0
+PRIORITY_BACKGROUND = 1
+
+
+class MELKLEDConnectionManager:
+    """Schedule connects with bounded concurrency per adapter/proxy."""
+
+    def __init__(self, max_per_source: int = MAX_CONNECTS_PER_SOURCE) -> None:
+        self._max_per_source = max_per_source
+        self._connecting: dict[str, int] = defaultdict(int)
+        self._waiters: dict[str, list[tuple[int, int, asyncio.Future]]] = defaultdict(list)
+        self._seq = itertools.count()
+        # Адрес -> источник, через который устройство сейчас подключено
+        self._connected: dict[str, str] = {}
+
+    # =========================================================
+    # Слоты подключения
+    # =========================================================
+    async def _acquire(self, source: str, priority: int) -> None:
+        waiters = self._waiters[source]
+        if self._connecting[source] < self._max_per_source and not waiters:
+            self._connecting[source] += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Слот уже был передан нам - возвращаем его следующему
+                self._release(source)
+            raise
+
+    def _release(self, source: str) -> None:
+        waiters = self._waiters[source]
+        while waiters:
+            _, _, future = heapq.heappop(waiters)
+            if not future.done():
+                # Передаём слот напрямую, счётчик не меняется
+                future.set_result(None)
+                return
+        self._connecting[source] -= 1
+
+    @asynccontextmanager
+    async def async_connect_slot(
+        self, source: str, priority: int = PRIORITY_BACKGROUND
+    ) -> AsyncIterator[None]:
+        """Hold one of the adapter's connect slots while connecting."""
+        await self._acquire(source, priority)
+        try:
+            yield
+        finally:
+            self._release(source)
+
+    # =========================================================
+    # Учёт подключений
+    # =========================================================
+    @callback
+    def async_mark_connected(self, address: str, source: str) -> None:
+        self._connected[address] = source
+
+    @callback
+    def async_mark_disconnected(self, address: str) -> None:
+        self._connected.pop(address, None)
+
+    def slot_usage(self) -> dict[str, dict[str, int]]:
+        """Connect slots in use, queued connects and live links per source."""
+        sources = set(self._connecting) | set(self._connected.values())
+        usage = {
+            source: {
+                "connecting": self._connecting.get(source, 0),
+                "waiting": sum(1 for *_, f in self._waiters.get(source, ()) if not f.done()),
+                "connected": 0,
+                "max_connecting": self._max_per_source,
+            }
+            for source in sources
+        }
+        for source in self._connected.values():
+            usage[source]["connected"] += 1
+        return usage
+
+
+@callback
+def async_get_connection_manager(hass: HomeAssistant) -> MELKLEDConnectionManager:
+    """Return the integration-wide connection manager."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_CONNECTION_MANAGER not in domain_data:
+        domain_data[DATA_CONNECTION_MANAGER] = MELKLEDConnectionManager()
+    return domain_data[DATA_CONNECTION_MANAGER]
@@ -0,0 +1,63 @@
+"""Diagnostics support for MELK LED Strip."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_MAC
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .elkbledom import BLEDOMInstance
+from .zone import MELKLEDZone
+
+TO_REDACT = {CONF_MAC}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return cached state, connection history and the recent command trace."""
+    obj = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    data: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+    }
+
+    if isinstance(obj, MELKLEDZone):
+        data["zone"] = {
+            "members": obj.members,
+            "loaded": [instance.address for instance in obj.instances],
+        }
+        return data
+    if not isinstance(obj, BLEDOMInstance):
+        return data
+
+    data["state"] = {
+        "is_on": obj.is_on,
+        "rgb_color": obj.rgb_color,
+        "brightness": obj.brightness,
+    }
+    data["transport"] = {
+        "adapter_source": obj.adapter_source,
+        "last_rssi": obj.last_rssi,
+        "connected_time": round(obj.connected_time, 1),
+        "commands_sent": obj.commands_sent,
+        "commands_coalesced": obj.coalesced_commands,
+        "writes_suppressed": obj.suppressed_writes,
+        "reconciliations": obj.reconciliations,
+        "retries": obj.retried_attempts,
+        "reconnects": obj.reconnects,
+        "connect_failures": obj.connect_failures,
+        "queue_depth": obj.queue_depth,
+        "write_gap": round(obj.write_gap, 4),
+        "dropped_stream_frames": obj.dropped_stream_frames,
+    }
+    if obj.latency_probe:
+        data["latency_ms"] = {f"p{pct}": obj.latency_percentile(pct) for pct in (50, 95, 99)}
+    data["connection_history"] = obj.connection_history.as_list()
+    data["commands"] = obj.command_trace.as_list()
+    return data
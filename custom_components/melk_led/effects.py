@@ -0,0 +1,126 @@
+"""Shared catalog of MELK LED Strip effects and scenes."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
+
+from .protocol import effect_frame, scene_frame
+
+LOGGER = logging.getLogger(__name__)
+
+# Сколько режимов умеет лента (как в README); сверяется при сборке каталога
+EXPECTED_EFFECTS = 213
+EXPECTED_SCENES = 28
+
+KIND_STATIC = "static"
+KIND_EFFECT = "effect"
+KIND_SCENE = "scene"
+
+
+@dataclass(frozen=True, slots=True)
+class EffectEntry:
+    """One selectable mode: static color, built-in effect or scene."""
+
+    key: str
+    label: str
+    kind: str
+    id: int
+    # Готовый кадр (для статичного цвета кадр собирается из RGB)
+    frame: bytes | None
+
+    @property
+    def state_args(self) -> dict[str, int | bool]:
+        """apply_state() arguments that select this mode."""
+        if self.kind == KIND_STATIC:
+            return {"static": True}
+        if self.kind == KIND_SCENE:
+            return {"scene": self.id}
+        return {"effect": self.id}
+
+
+class EffectCatalog:
+    """Immutable, ordered effect lookup built once and shared by all entities.
+
+    Entries are identified by (kind, id): effects and scenes reuse the same
+    numeric ids, so a raw id alone is ambiguous.
+    """
+
+    __slots__ = ("entries", "labels", "_by_key", "_by_label", "_by_id")
+
+    def __init__(self, entries: tuple[EffectEntry, ...]) -> None:
+        self.entries = entries
+        # Порядок списка в UI: статичный цвет, эффекты, сцены
+        self.labels: tuple[str, ...] = tuple(entry.label for entry in entries)
+        self._by_key = MappingProxyType({entry.key: entry for entry in entries})
+        self._by_label = MappingProxyType({entry.label: entry for entry in entries})
+        self._by_id = MappingProxyType({(entry.kind, entry.id): entry for entry in entries})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> EffectEntry | None:
+        return self._by_key.get(key)
+
+    def by_id(self, kind: str, id_: int) -> EffectEntry | None:
+        return self._by_id.get((kind, id_))
+
+    def count(self, kind: str) -> int:
+        return sum(1 for entry in self.entries if entry.kind == kind)
+
+    def self_check(self) -> list[str]:
+        """Return problems with the catalog (empty when it is consistent)."""
+        problems = []
+        for kind, expected in ((KIND_EFFECT, EXPECTED_EFFECTS), (KIND_SCENE, EXPECTED_SCENES)):
+            if (found := self.count(kind)) != expected:
+                problems.append(f"{found} {kind}s reachable, {expected} expected")
+        for name, index in (("key", self._by_key), ("label", self._by_label), ("id", self._by_id)):
+            if len(index) != len(self.entries):
+                problems.append(f"duplicate {name}s: {len(self.entries) - len(index)}")
+        return problems
+
+    def from_label(self, label: str) -> EffectEntry | None:
+        """Resolve a UI label (or a raw key) to its entry."""
+        return self._by_label.get(label) or self._by_key.get(label)
+
+    def label(self, key: str, default: str = "none") -> str:
+        entry = self._by_key.get(key)
+        return entry.label if entry else default
+
+
+def _build_catalog() -> EffectCatalog:
+    # Большие таблицы импортируются только здесь, при первой сборке каталога
+    from .effect_tables import EFFECT_LABELS, EFFECTS, SCENE_LABELS, SCENES
+
+    # Статичный цвет первым в списке UI
+    entries: list[EffectEntry] = [
+        EffectEntry("none", EFFECT_LABELS.get("none", "none"), KIND_STATIC, 0, None)
+    ]
+    for effect in EFFECTS:
+        entries.append(
+            EffectEntry(
+                effect.name,
+                EFFECT_LABELS.get(effect.name, effect.name),
+                KIND_EFFECT,
+                effect.value,
+                effect_frame(effect.value),
+            )
+        )
+    for scene in SCENES:
+        key = f"scene_{scene.name}"
+        entries.append(
+            EffectEntry(
+                key, SCENE_LABELS.get(key, key), KIND_SCENE, scene.value, scene_frame(scene.value)
+            )
+        )
+    catalog = EffectCatalog(tuple(entries))
+    for problem in catalog.self_check():
+        LOGGER.error("Effect catalog inconsistent: %s", problem)
+    return catalog
+
+
+@cache
+def get_effect_catalog() -> EffectCatalog:
+    """Return the process-wide effect catalog, building it on first use."""
+    return _build_catalog()
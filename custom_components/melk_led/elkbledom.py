@@ -1,9 +1,11 @@
 """BLE communication for MELK LED Strip with correct protocol commands."""
 import asyncio
 import logging
-import json
-import os
-from typing import Tuple, TypeVar, Callable, cast, Any
+import itertools
+import random
+import time
+from contextlib import suppress
+from typing import Tuple, TypeVar, Callable, cast, Any, Hashable
 from bleak.backends.service import BleakGATTServiceCollection
 
 try:
@@ -21,8 +23,41 @@ from bleak_retry_connector import (
     BLEAK_RETRY_EXCEPTIONS as BLEAK_EXCEPTIONS,
     establish_connection,
 )
-from homeassistant.components.bluetooth import async_ble_device_from_address
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+    async_ble_device_from_address,
+    async_last_service_info,
+    async_register_callback,
+)
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_IDLE_TIMEOUT, DEFAULT_RECONCILE_INTERVAL, DEFAULT_RESEND_INTERVAL
+from .animation import async_get_animator
+from .connection import PRIORITY_BACKGROUND, PRIORITY_COMMAND, async_get_connection_manager
+from .effects import KIND_EFFECT, KIND_SCENE, get_effect_catalog
+from .latency import LatencyHistogram
+from .pacing import WritePacer, async_get_adapter_pacer, async_wait, device_pacer
+from .protocol import (
+    TURN_OFF_CMD,
+    TURN_ON_CMD,
+    brightness_frame,
+    color_frame,
+    effect_frame,
+    eq_frame,
+    mic_frame,
+    mic_sensitivity_frame,
+    scene_frame,
+    speed_frame,
+)
+from .reconcile import async_get_reconciler
+from .snapshot import DeviceSnapshot
+from .storage import async_get_state_store
+from .trace import CommandTrace, ConnectionHistory
 
 LOGGER = logging.getLogger(__name__)
 
@@ -30,10 +65,7 @@ LOGGER = logging.getLogger(__name__)
 # Правильные команды из Magic Lantern APK v6.9.6
 # =========================================================
 # Формат команды: 7E [CMD] [SUBCMD] [PARAM1] [PARAM2] [PARAM3] [PARAM4] [PARAM5] EF
-
-# Включение/выключение
-TURN_ON_CMD = [0x7E, 0x04, 0x04, 0x01, 0xFF, 0xFF, 0xFF, 0x00, 0xEF]
-TURN_OFF_CMD = [0x7E, 0x04, 0x04, 0x00, 0xFF, 0xFF, 0xFF, 0x00, 0xEF]
+# Готовые кадры собраны в protocol.py
 
 # UUID для записи команд
 WRITE_CHARACTERISTIC_UUID = "0000fff3-0000-1000-8000-00805f9b34fb"
@@ -41,32 +73,91 @@ WRITE_CHARACTERISTIC_UUID = "0000fff3-0000-1000-8000-00805f9b34fb"
 # Настройки повторных попыток
 DEFAULT_ATTEMPTS = 3
 BLEAK_BACKOFF_TIME = 0.25
-STATE_FILE = "/config/.storage/melk_led_state.json"
+# Общий бюджет времени на запись одной команды (все попытки вместе);
+# подключение в бюджет не входит
+COMMAND_TIME_BUDGET = 5.0
+# Отдельный предел на подключения одной команды (без ожидания слота):
+# через прокси establish_connection бывает заметно дольше записи
+CONNECT_TIME_BUDGET = 20.0
+# Переподключение: экспоненциальная пауза со случайным разбросом
+RECONNECT_BACKOFF_MIN = 1.0
+RECONNECT_BACKOFF_MAX = 300.0
+# Реклама после такой тишины значит, что ленту снова включили: паузу прерываем
+ADVERTISEMENT_SILENCE = 30.0
 RETRY_BACKOFF_EXCEPTIONS = (BleakDBusError,)
+# Период замера задержки (запись с подтверждением), секунды
+PROBE_INTERVAL = 60
+
+# Каналы очереди команд: новая команда канала вытесняет ещё не отправленную
+CHANNEL_POWER = "power"
+CHANNEL_BRIGHTNESS = "brightness"
+CHANNEL_COLOR = "color"
+CHANNEL_EFFECT = "effect"
+CHANNEL_SPEED = "speed"
+CHANNEL_MIC = "mic"
+CHANNEL_MIC_SENSITIVITY = "mic_sensitivity"
+CHANNEL_MIC_EQ = "mic_eq"
+# Замер задержки: единственный кадр, который пишется с подтверждением
+CHANNEL_PROBE = "probe"
+
+# Фильтр повторных записей: что меняет кадр канала на ленте.
+# Цвет, эффект и сцена - один "режим": последний записанный побеждает
+FILTER_SLOTS = {
+    CHANNEL_POWER: CHANNEL_POWER,
+    CHANNEL_BRIGHTNESS: CHANNEL_BRIGHTNESS,
+    CHANNEL_COLOR: "mode",
+    CHANNEL_EFFECT: "mode",
+    CHANNEL_SPEED: CHANNEL_SPEED,
+    CHANNEL_MIC: CHANNEL_MIC,
+    CHANNEL_MIC_SENSITIVITY: CHANNEL_MIC_SENSITIVITY,
+    CHANNEL_MIC_EQ: CHANNEL_MIC_EQ,
+}
+# Переключение микрофона меняет режим на ленте и требует заново задать его настройки
+SLOT_INVALIDATES = {CHANNEL_MIC: ("mode", CHANNEL_MIC_SENSITIVITY, CHANNEL_MIC_EQ)}
 
 WrapFuncType = TypeVar("WrapFuncType", bound=Callable[..., Any])
 
 
+
 # =========================================================
 # Декоратор безопасных повторных попыток BLE
 # =========================================================
 def retry_bluetooth_connection_error(func: WrapFuncType) -> WrapFuncType:
-    """Retry decorator for BLE operations."""
+    """Retry decorator for BLE operations.
+
+    Applied once, at the transport layer only: at most DEFAULT_ATTEMPTS
+    attempts, whose writes share one COMMAND_TIME_BUDGET. Connecting runs
+    before each attempt with its own CONNECT_TIME_BUDGET (waiting for a
+    connect slot is not counted) and is not retried here:
+    establish_connection already retries on its own.
+    """
     async def _async_wrap_retry(self: "BLEDOMInstance", *args, **kwargs):
-        for attempt in range(DEFAULT_ATTEMPTS):
+        budget = COMMAND_TIME_BUDGET
+        connect_budget = CONNECT_TIME_BUDGET
+        attempt = 0
+        while True:
+            attempt += 1
+            self._record_attempt(attempt)
+            connects = self._connects
+            await self._ensure_connected(timeout=connect_budget)
+            if self._connects != connects:
+                connect_budget -= self._last_connect_duration or 0.0
+            started = time.monotonic()
             try:
-                return await func(self, *args, **kwargs)
+                return await asyncio.wait_for(func(self, *args, **kwargs), budget)
             except BleakNotFoundError:
                 raise
-            except RETRY_BACKOFF_EXCEPTIONS as err:
-                if attempt == DEFAULT_ATTEMPTS - 1:
+            except (*RETRY_BACKOFF_EXCEPTIONS, *BLEAK_EXCEPTIONS, asyncio.TimeoutError) as err:
+                budget -= time.monotonic() - started
+                backoff = BLEAK_BACKOFF_TIME if isinstance(err, RETRY_BACKOFF_EXCEPTIONS) else 0
+                if attempt >= DEFAULT_ATTEMPTS:
                     LOGGER.error("%s: BLE retry exhausted: %s", self.name, err)
                     raise
-                await asyncio.sleep(BLEAK_BACKOFF_TIME)
-            except BLEAK_EXCEPTIONS as err:
-                if attempt == DEFAULT_ATTEMPTS - 1:
-                    LOGGER.error("%s: BLE exception: %s", self.name, err)
+                if budget <= backoff:
+                    LOGGER.error("%s: BLE command time budget exceeded: %s", self.name, err)
                     raise
+                if backoff:
+                    await asyncio.sleep(backoff)
     return cast(WrapFuncType, _async_wrap_retry)
 
 
@@ -76,11 +167,36 @@ def retry_bluetooth_connection_error(func: WrapFuncType) -> WrapFuncType:
 class BLEDOMInstance:
     """MELK LED Strip BLE device instance."""
 
-    def __init__(self, address, reset: bool, delay: int, hass) -> None:
+    def __init__(
+        self,
+        address,
+        reset: bool,
+        delay: int,
+        hass,
+        on_demand: bool = False,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        latency_probe: bool = False,
+        resend_interval: float = DEFAULT_RESEND_INTERVAL,
+        reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL,
+    ) -> None:
         self.address = address
         self._reset = reset
         self._delay = delay
         self._hass = hass
+        # Режим "по требованию": подключаемся под команды, отключаемся при простое
+        self._on_demand = on_demand
+        self._idle_timeout = idle_timeout
+        self._keep_alive_until = 0.0
+        self._unsub_idle: CALLBACK_TYPE | None = None
+        self._expected_disconnect = False
+        self._stopped = False
+        # Машина переподключения: одна задача, будится отключением или рекламой
+        self._reconnect_task: asyncio.Task | None = None
+        self._reconnect_wakeup = asyncio.Event()
+        self._last_advertisement: float | None = None
+        # Первая реклама после отключения подключает сразу и отправляет очередь
+        self._first_advertisement = True
+        self._last_rssi: int | None = None
 
         self._device = async_ble_device_from_address(hass, address)
         if not self._device:
@@ -90,75 +206,163 @@ class BLEDOMInstance:
         self._connect_lock = asyncio.Lock()
         self._cached_services: BleakGATTServiceCollection | None = None
         self._write_uuid = None
+        self._store = async_get_state_store(hass)
+        self._connections = async_get_connection_manager(hass)
+
+        # Очередь исходящих команд: канал -> (кадр, ожидающие futures, время постановки)
+        self._queue: dict[Hashable, tuple[bytes, list[asyncio.Future], float]] = {}
+        self._queue_keys = itertools.count()
+        self._writer_task: asyncio.Task | None = None
+        self._coalesced_commands = 0
+
+        # Счётчики попыток транспортного уровня (для диагностики)
+        self._last_command_attempts = 0
+        self._retried_attempts = 0
+        self._commands_sent = 0
+        self._connects = 0
+        self._connect_failures = 0
+        self._last_connect_duration: float | None = None
+        self._connected_at: float | None = None
+        # Журналы для выгрузки диагностики
+        self._trace = CommandTrace()
+        self._connection_history = ConnectionHistory()
+
+        # Адаптивная пауза между записями (устройство + адаптер/прокси)
+        self._pacer = device_pacer()
+
+        # Замер задержки записью с подтверждением (опция)
+        self._latency_probe = latency_probe
+        self._latency = LatencyHistogram()
+        self._unsub_probe: CALLBACK_TYPE | None = None
+
+        # Фильтр повторных записей: {слот: (кадр, когда записан)}.
+        # Лента ничего не сообщает, поэтому кадр повторяется раз в resend_interval
+        # (0 - никогда)
+        self._resend_interval = resend_interval
+        self._in_place: dict[str, tuple[bytes, float]] = {}
+        self._suppressed_writes = 0
+
+        # Сверка: кэш состояния заново отправляется на ленту после
+        # переподключения и (опционально) по расписанию
+        self._reconcile_interval = reconcile_interval
+        self._reconcile_pending = False
+        self._unsub_reconcile: CALLBACK_TYPE | None = None
+        self._reconciliations = 0
+        self._last_command_at = 0.0
 
         # Начальные значения
         self._is_on = False
         self._rgb_color: Tuple[int, int, int] = (255, 255, 255)
         self._brightness: int = 255
         self._effect_speed: int = 50
+        self._effect_brightness: int = 100
+        # Последний записанный кадр яркости: им же задаётся яркость эффекта
+        self._written_brightness: bytes | None = None
         self._last_effect: int | None = None
+        self._last_scene: int | None = None
+        # Выбранный режим (ключ каталога эффектов) - для UI и восстановления
+        self._effect_key = "none"
+        # Режим микрофона
+        self._mic_enabled = False
+        self._mic_sensitivity: int = 50
+        self._mic_eq_mode: int = 0x80
+        self._mode_before_mic = "none"
+        # Сущности всех платформ подписываются на изменения состояния
+        self._listeners: list[CALLBACK_TYPE] = []
+        # На ленте кадр анимации, а не сохранённый цвет
+        self._color_streamed = False
+        self._dropped_stream_frames = 0
 
-        asyncio.create_task(self._async_init_state())
-        asyncio.create_task(self._delayed_connect())
-        asyncio.create_task(self._heartbeat())
+        self._init_state()
+        self._unsub_advertisement = async_register_callback(
+            hass,
+            self._async_on_advertisement,
+            BluetoothCallbackMatcher(address=address, connectable=True),
+            BluetoothScanningMode.PASSIVE,
+        )
+        self._async_request_reconnect()
+        if latency_probe:
+            self._unsub_probe = async_call_later(hass, PROBE_INTERVAL, self._async_probe)
+        if reconcile_interval:
+            # Случайный первый срок разносит сверку многих лент во времени
+            self._unsub_reconcile = async_call_later(
+                hass, random.uniform(1, reconcile_interval), self._async_reconcile_due
+            )
 
     # =========================================================
-    # JSON-состояние
+    # Сохранённое состояние
     # =========================================================
-    def _load_state_sync(self):
-        """Load state from JSON file."""
-        try:
-            os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-            if os.path.exists(STATE_FILE):
-                with open(STATE_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return data.get(self.address, {})
-        except Exception as e:
-            LOGGER.warning("Failed to load state for %s: %s", self.address, e)
-        return {}
+    def _save_state(self) -> None:
+        """Schedule a debounced save of the current state."""
+        self._store.async_set(
+            self.address,
+            {
+                "is_on": self._is_on,
+                "rgb": self._rgb_color,
+                "brightness": self._brightness,
+                "effect": self._effect_key,
+                "speed": self._effect_speed,
+                "effect_brightness": self._effect_brightness,
+                "mic": self._mic_enabled,
+                "mode_before_mic": self._mode_before_mic,
+                "mic_sensitivity": self._mic_sensitivity,
+                "mic_eq": self._mic_eq_mode,
+            },
+        )
 
-    async def _async_load_state(self):
-        """Load state asynchronously."""
-        return await self._hass.async_add_executor_job(self._load_state_sync)
-
-    def _save_state_sync(self, payload: dict | None = None):
-        """Save state to JSON file."""
-        try:
-            os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-            data: dict = {}
-            if os.path.exists(STATE_FILE):
-                try:
-                    with open(STATE_FILE, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                except json.JSONDecodeError:
-                    data = {}
-
-            if payload is None:
-                payload = {
-                    "is_on": self._is_on,
-                    "rgb": self._rgb_color,
-                    "brightness": self._brightness,
-                }
-
-            data[self.address] = payload
-            with open(STATE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            LOGGER.error("Failed to save state for %s: %s", self.address, e)
-
-    async def _async_save_state(self, payload: dict | None = None):
-        """Save state asynchronously."""
-        await self._hass.async_add_executor_job(self._save_state_sync, payload)
-
-    async def _async_init_state(self):
-        """Initialize state from saved data."""
-        state = await self._async_load_state()
+    def _init_state(self):
+        """Initialize state from saved data (store is loaded during setup)."""
+        state = self._store.get(self.address)
         self._is_on = state.get("is_on", False)
         self._rgb_color = tuple(state.get("rgb", (255, 255, 255)))  # type: ignore[arg-type]
         self._brightness = int(state.get("brightness", 255))
-        LOGGER.info("%s: Loaded state from JSON: is_on=%s, rgb=%s, brightness=%s", 
+        self._effect_speed = int(state.get("speed", 50))
+        self._effect_brightness = int(state.get("effect_brightness", 100))
+        self._mode_before_mic = state.get("mode_before_mic", "none")
+        # Выключенная лента не может быть в режиме микрофона
+        self._mic_enabled = self._is_on and bool(state.get("mic", False))
+        if state.get("mic", False) and not self._mic_enabled:
+            # Микрофон выключился вместе с лентой - её режим тот, что был до него
+            self._set_mode_key(self._mode_before_mic)
+        else:
+            self._set_mode_key(state.get("effect", "none"))
+        self._mic_sensitivity = int(state.get("mic_sensitivity", 50))
+        self._mic_eq_mode = int(state.get("mic_eq", 0x80))
+        LOGGER.debug("%s: Loaded saved state: is_on=%s, rgb=%s, brightness=%s", 
                    self.name, self._is_on, self._rgb_color, self._brightness)
 
+    # =========================================================
+    # Подписки на изменения состояния
+    # =========================================================
+    @callback
+    def async_subscribe(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback whenever the device state changes."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._listeners.remove(update_callback)
+
+        return _unsubscribe
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _set_mode_key(self, key: str) -> None:
+        """Select the cached mode by catalog key; effect/scene ids follow from it."""
+        entry = get_effect_catalog().get(key)
+        if entry is None or entry.frame is None:
+            key = "none"
+        self._effect_key = key
+        self._last_effect = entry.id if entry is not None and entry.kind == KIND_EFFECT else None
+        self._last_scene = entry.id if entry is not None and entry.kind == KIND_SCENE else None
+
+    def _mode_key(self, kind: str, id_: int) -> str:
+        entry = get_effect_catalog().by_id(kind, id_)
+        return entry.key if entry else "none"
+
     # =========================================================
     # Свойства
     # =========================================================
@@ -178,79 +382,671 @@ class BLEDOMInstance:
     def rgb_color(self) -> tuple[int, int, int]:
         return getattr(self, "_rgb_color", (255, 255, 255))
 
+    @property
+    def effect_key(self) -> str:
+        """Catalog key of the selected mode ("none" is static color)."""
+        return self._effect_key
+
+    @property
+    def effect_speed(self) -> int:
+        return self._effect_speed
+
+    @property
+    def effect_brightness(self) -> int:
+        return self._effect_brightness
+
+    @property
+    def mic_enabled(self) -> bool:
+        return self._mic_enabled
+
+    @property
+    def mic_sensitivity(self) -> int:
+        return self._mic_sensitivity
+
+    @property
+    def mic_eq_mode(self) -> int:
+        return self._mic_eq_mode
+
+    @callback
+    def restore_effect_key(self, key: str) -> None:
+        """Remember the mode restored by the light entity (nothing is sent)."""
+        self._set_mode_key(key)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def coalesced_commands(self) -> int:
+        return self._coalesced_commands
+
+    @property
+    def suppressed_writes(self) -> int:
+        return self._suppressed_writes
+
+    @property
+    def reconciliations(self) -> int:
+        return self._reconciliations
+
+    @property
+    def idle_time(self) -> float:
+        """Seconds since the last command was queued."""
+        return time.monotonic() - self._last_command_at
+
+    @property
+    def reconcile_ready(self) -> bool:
+        """True when a re-sync would not get in the way of commands or an animation."""
+        # Выключенная лента не показывает кадр анимации, даже если он был последним
+        return not self._queue and (not self._color_streamed or not self._is_on)
+
+    @property
+    def last_command_attempts(self) -> int:
+        """Attempts used by the most recent command."""
+        return self._last_command_attempts
+
+    @property
+    def retried_attempts(self) -> int:
+        """Total retry attempts (beyond the first) since start."""
+        return self._retried_attempts
+
+    def _record_attempt(self, attempt: int) -> None:
+        self._last_command_attempts = attempt
+        if attempt > 1:
+            self._retried_attempts += 1
+
+    @property
+    def commands_sent(self) -> int:
+        return self._commands_sent
+
+    @property
+    def reconnects(self) -> int:
+        """Successful connects after the first one."""
+        return max(0, self._connects - 1)
+
+    @property
+    def connect_failures(self) -> int:
+        return self._connect_failures
+
+    @property
+    def last_connect_duration(self) -> float | None:
+        """Duration of the last successful connect, in seconds."""
+        return self._last_connect_duration
+
+    @property
+    def connected_time(self) -> float:
+        """Seconds the current link has been up (0 when disconnected)."""
+        if self._connected_at is None:
+            return 0.0
+        return time.monotonic() - self._connected_at
+
+    @property
+    def adapter_links(self) -> int:
+        """Live links on the adapter or proxy this strip uses."""
+        usage = self._connections.slot_usage().get(self.adapter_source, {})
+        return usage.get("connected", 0)
+
+    @property
+    def command_trace(self) -> CommandTrace:
+        return self._trace
+
+    @property
+    def connection_history(self) -> ConnectionHistory:
+        return self._connection_history
+
+    @property
+    def latency_probe(self) -> bool:
+        return self._latency_probe
+
+    def latency_percentile(self, pct: float) -> float | None:
+        """Round-trip write latency percentile in ms over recent probes."""
+        return self._latency.percentile(pct)
+
+    @property
+    def last_rssi(self) -> int | None:
+        """RSSI of the last advertisement seen from this strip."""
+        return self._last_rssi
+
+    @property
+    def adapter_source(self) -> str:
+        """Adapter or proxy that last saw this strip."""
+        info = async_last_service_info(self._hass, self.address, connectable=True)
+        return info.source if info else "unknown"
+
+    @property
+    def write_gap(self) -> float:
+        """Learned minimum gap between writes, in seconds."""
+        adapter = async_get_adapter_pacer(self._hass, self.adapter_source)
+        return max(self._pacer.gap, adapter.gap)
+
     # =========================================================
     # Подключение BLE
     # =========================================================
-    async def _delayed_connect(self):
-        """Delayed initial connection."""
-        await asyncio.sleep(3)
-        await self._ensure_connected()
+    async def _ensure_connected(
+        self, priority: int | None = None, timeout: float = CONNECT_TIME_BUDGET
+    ):
+        """Ensure BLE connection is established, raise if it can't be.
 
-    async def _ensure_connected(self):
-        """Ensure BLE connection is established."""
+        `timeout` bounds establish_connection only, not the wait for a slot.
+        """
+        if self._stopped:
+            # После stop() ссылку не поднимаем: запись не повторяется
+            raise self._stopped_error()
         if self._client and self._client.is_connected:
             return
         async with self._connect_lock:
+            if self._stopped:
+                raise self._stopped_error()
+            if self._client and self._client.is_connected:
+                return
             try:
-                client = await establish_connection(
-                    BleakClientWithServiceCache,
-                    self._device,
-                    self._device.name,
-                    self._disconnected,
-                    cached_services=self._cached_services,
-                )
+                # Свежий BLEDevice: HA отдаёт сканер/прокси с лучшим RSSI
+                self._refresh_device()
+                source = self.adapter_source
+                # Устройства с командами в очереди получают слот раньше
+                if priority is None:
+                    priority = PRIORITY_COMMAND if self._queue else PRIORITY_BACKGROUND
+                async with self._connections.async_connect_slot(source, priority):
+                    started = time.monotonic()
+                    client = await asyncio.wait_for(
+                        establish_connection(
+                            BleakClientWithServiceCache,
+                            self._device,
+                            self._device.name,
+                            self._disconnected,
+                            cached_services=self._cached_services,
+                        ),
+                        max(timeout, 0.0),
+                    )
                 self._client = client
+                self._connected_at = time.monotonic()
+                self._last_connect_duration = self._connected_at - started
+                self._connects += 1
+                self._connection_history.record("connected", source, self._last_connect_duration)
                 self._cached_services = client.services
+                self._expected_disconnect = False
+                self._connections.async_mark_connected(self.address, source)
                 
                 # Найти характеристику для записи
                 c = client.services.get_characteristic(WRITE_CHARACTERISTIC_UUID)
                 if c:
                     self._write_uuid = c
-                    LOGGER.info("%s connected", self._device.name)
+                    LOGGER.debug("%s connected", self._device.name)
+                    if self._reconcile_pending:
+                        self._reconcile_pending = False
+                        async_get_reconciler(self._hass).async_request(self)
                 else:
                     LOGGER.error("%s: write characteristic not found", self._device.name)
             except Exception as e:
-                LOGGER.error("%s: connection failed: %s", self._device.name, e)
-                await asyncio.sleep(5)
-                asyncio.create_task(self._ensure_connected())
+                self._connect_failures += 1
+                self._connection_history.record("connect_failed", self.adapter_source)
+                LOGGER.debug("%s: connection failed: %s", self._device.name, e)
+                raise
+
+    @callback
+    def _refresh_device(self) -> None:
+        device = async_ble_device_from_address(self._hass, self.address, connectable=True)
+        if device:
+            self._device = device
 
     def _disconnected(self, _client):
         """Handle disconnection."""
-        asyncio.create_task(self._ensure_connected())
+        if self._connected_at is not None:
+            self._connection_history.record(
+                "disconnected", None, time.monotonic() - self._connected_at
+            )
+        self._connected_at = None
+        self._connections.async_mark_disconnected(self.address)
+        self._first_advertisement = True
+        if self._expected_disconnect:
+            return
+        # Связь могла пропасть из-за отключения питания ленты - её состояние неизвестно
+        self._in_place.clear()
+        self._reconcile_pending = True
+        self._async_request_reconnect()
 
-    async def _heartbeat(self):
-        """Maintain connection with periodic checks."""
-        while True:
-            if not self._client or not self._client.is_connected:
+    # =========================================================
+    # Переподключение (по событиям, без периодического опроса)
+    # =========================================================
+    @callback
+    def _async_request_reconnect(self) -> None:
+        """Start the reconnect state machine, or wake it if it is backing off."""
+        if self._on_demand or self._stopped:
+            return
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._async_reconnect_loop())
+        else:
+            self._reconnect_wakeup.set()
+
+    async def _async_reconnect_loop(self) -> None:
+        """Reconnect with jittered exponential backoff until connected."""
+        failures = 0
+        while not self._stopped and not (self._client and self._client.is_connected):
+            self._reconnect_wakeup.clear()
+            try:
                 await self._ensure_connected()
-            await asyncio.sleep(30)
+            except Exception as e:
+                failures += 1
+                # Степень ограничена: после ~1000 неудач 2 ** failures переполняет float
+                cap = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_MIN * 2 ** min(failures, 16))
+                delay = random.uniform(RECONNECT_BACKOFF_MIN, cap)
+                log = LOGGER.warning if failures == 1 else LOGGER.debug
+                log("%s: reconnect failed (%s), next attempt in %.0fs", self.name, e, delay)
+                # Реклама или отключение прерывают ожидание досрочно
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._reconnect_wakeup.wait(), delay)
+        # Команды, ждавшие подключения, уходят сразу
+        self._async_kick_writer()
+
+    @callback
+    def _async_on_advertisement(
+        self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+    ) -> None:
+        """Strip is advertising: it is powered and in range, connect now."""
+        now = time.monotonic()
+        silent = (
+            self._last_advertisement is None
+            or now - self._last_advertisement >= ADVERTISEMENT_SILENCE
+        )
+        self._last_advertisement = now
+        self._last_rssi = service_info.rssi
+        if self._client and self._client.is_connected:
+            return
+        self._device = service_info.device
+        self._refresh_device()
+        first, self._first_advertisement = self._first_advertisement, False
+        if not (first or silent):
+            # Лента рекламируется, но подключиться не удаётся (нет слотов, далеко):
+            # обновили устройство, паузу переподключения не прерываем
+            return
+        if self._queue:
+            # Есть команды - писатель сам подключится и отправит их
+            self._async_kick_writer()
+        self._async_request_reconnect()
+
+    @callback
+    def _async_kick_writer(self) -> None:
+        """Start the writer if commands are queued and nobody sends them."""
+        if self._queue and (self._writer_task is None or self._writer_task.done()):
+            self._writer_task = asyncio.create_task(self._process_queue())
 
     # =========================================================
-    # BLE-команды (правильные из Magic Lantern APK)
+    # Подключение по требованию
     # =========================================================
-    @retry_bluetooth_connection_error
-    async def _write(self, data: list[int]):
-        """Write command to BLE device."""
+    async def async_warm_up(self, hold: float | None = None) -> None:
+        """Pre-connect hint: open the link now and keep it for `hold` seconds."""
+        hold = self._idle_timeout if hold is None else hold
+        self._keep_alive_until = max(self._keep_alive_until, time.monotonic() + hold)
+        self._cancel_idle_disconnect()
         await self._ensure_connected()
-        await self._client.write_gatt_char(self._write_uuid, bytearray(data), False)
-        # Добавляем задержку между командами для стабильности
-        await asyncio.sleep(0.15)
+        self._schedule_idle_disconnect()
+
+    def _cancel_idle_disconnect(self) -> None:
+        if self._unsub_idle is not None:
+            self._unsub_idle()
+            self._unsub_idle = None
+
+    def _schedule_idle_disconnect(self) -> None:
+        """Disconnect after the idle window (on-demand mode only)."""
+        if not self._on_demand:
+            return
+        self._cancel_idle_disconnect()
+        delay = max(self._idle_timeout, self._keep_alive_until - time.monotonic())
+        self._unsub_idle = async_call_later(self._hass, delay, self._async_idle_disconnect)
+
+    async def _async_idle_disconnect(self, _now) -> None:
+        self._unsub_idle = None
+        if self._queue or (self._writer_task and not self._writer_task.done()):
+            return
+        if self._client and self._client.is_connected:
+            LOGGER.debug("%s: idle, disconnecting to free the connection slot", self.name)
+            self._expected_disconnect = True
+            await self._client.disconnect()
+
+    # =========================================================
+    # Замер задержки
+    # =========================================================
+    async def _async_probe(self, _now) -> None:
+        """Send a write-with-response no-op and time it; never forces a connect."""
+        self._unsub_probe = async_call_later(self._hass, PROBE_INTERVAL, self._async_probe)
+        if not (self._client and self._client.is_connected) or self._color_streamed:
+            return
+        if self._queue:
+            # Поставленная, но не отправленная яркость новее записанной:
+            # повтор старого кадра вернул бы ленте прежнее значение
+            return
+        # Повтор яркости, которая уже записана на ленту, ничего не меняет
+        # (учитывает и яркость эффекта); если она неизвестна - пропускаем замер
+        in_place = self._in_place.get(CHANNEL_BRIGHTNESS)
+        if in_place is None:
+            return
+        data = in_place[0]
+        try:
+            await self._enqueue(data, CHANNEL_PROBE)
+        except Exception as err:  # noqa: BLE001
+            LOGGER.debug("%s: latency probe failed: %s", self.name, err)
+
+    # =========================================================
+    # BLE-команды (правильные из Magic Lantern APK)
+    # =========================================================
+    async def _write(self, data: bytes, channel: str | None = None):
+        """Queue command and wait until it (or a newer one) is sent."""
+        self._cancel_animation()
+        if self._is_redundant(data, channel):
+            return
+        await self._enqueue(data, channel)
+
+    def _is_redundant(self, data: bytes, channel: Hashable | None) -> bool:
+        """True (and counted) when the frame is already in place on the strip."""
+        slot = FILTER_SLOTS.get(channel)  # type: ignore[arg-type]
+        if slot is None:
+            return False
+        in_place = self._in_place.get(slot)
+        if in_place is None or in_place[0] != data:
+            return False
+        if self._resend_interval and time.monotonic() - in_place[1] > self._resend_interval:
+            return False
+        # Ждущий отправки кадр того же слота изменит его - пропускать нельзя
+        for queued in self._queue:
+            if FILTER_SLOTS.get(queued) == slot or slot in SLOT_INVALIDATES.get(queued, ()):  # type: ignore[arg-type]
+                return False
+        self._suppressed_writes += 1
+        return True
+
+    def _mark_in_place(self, data: bytes, channel: Hashable) -> None:
+        slot = FILTER_SLOTS.get(channel)  # type: ignore[arg-type]
+        if slot is None:
+            return
+        for other in SLOT_INVALIDATES.get(channel, ()):  # type: ignore[arg-type]
+            self._in_place.pop(other, None)
+        self._in_place[slot] = (data, time.monotonic())
+
+    def _enqueue(self, data: bytes, channel: str | None = None) -> asyncio.Future:
+        """Queue command, return a future resolved once it is sent.
+
+        Commands with the same channel are coalesced: a queued frame that has
+        not been sent yet is replaced by the newest one (last write wins).
+        Commands without a channel are never coalesced.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._stopped:
+            # Выгруженная лента: команда не ставится в очередь и не будит писателя
+            future.set_exception(self._stopped_error())
+            return future
+        if channel != CHANNEL_PROBE:
+            # Замер задержки не считается активностью: не держит ссылку
+            # в режиме "по требованию" и не откладывает сверку
+            self._cancel_idle_disconnect()
+            self._last_command_at = time.monotonic()
+        key: Hashable = channel if channel is not None else next(self._queue_keys)
+        waiters = [future]
+        enqueued = time.monotonic()
+        pending = self._queue.pop(key, None)
+        if pending is not None:
+            # Вытесненная команда не отправляется, её ожидающие получат результат новой
+            waiters = pending[1] + waiters
+            # Для трассы важно, сколько ждал самый первый вызов
+            enqueued = pending[2]
+            self._coalesced_commands += 1
+        # Переставляем в конец, чтобы сохранить порядок последних команд
+        self._queue[key] = (data, waiters, enqueued)
+
+        self._async_kick_writer()
+        return future
+
+    def _stopped_error(self) -> RuntimeError:
+        return RuntimeError(f"{self.name}: instance is stopped")
+
+    def _fail_waiters(self, waiters: list[asyncio.Future]) -> None:
+        """Resolve waiters of frames that will never be sent (instance stopped)."""
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(self._stopped_error())
+
+    async def _process_queue(self):
+        """Single writer: send queued commands one by one."""
+        only_probes = True
+        while self._queue:
+            key = next(iter(self._queue))
+            only_probes = only_probes and key == CHANNEL_PROBE
+            data, waiters, enqueued = self._queue.pop(key)
+            started = time.monotonic()
+            # Отмечаем заранее, чтобы такой же кадр не встал в очередь во время записи
+            self._mark_in_place(data, key)
+            try:
+                await self._send(data, key == CHANNEL_PROBE)
+            except asyncio.CancelledError:
+                # Писателя снял stop(): ожидающие кадра в полёте не должны зависнуть
+                self._fail_waiters(waiters)
+                raise
+            except Exception as err:  # noqa: BLE001 - передаём ошибку ожидающим
+                if (slot := FILTER_SLOTS.get(key)) is not None:  # type: ignore[arg-type]
+                    self._in_place.pop(slot, None)
+                self._trace.record(
+                    key, data, enqueued, started, time.monotonic(),
+                    self._last_command_attempts, False,
+                )
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+            else:
+                self._trace.record(
+                    key, data, enqueued, started, time.monotonic(),
+                    self._last_command_attempts, True,
+                )
+                if key == CHANNEL_BRIGHTNESS:
+                    self._written_brightness = data
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        # Один замер задержки не продлевает уже идущий отсчёт простоя
+        if not (only_probes and self._unsub_idle is not None):
+            self._schedule_idle_disconnect()
 
     @retry_bluetooth_connection_error
+    async def _send(self, data: bytes, response: bool = False):
+        """Write command to BLE device (with response: record round-trip time).
+
+        The retry decorator connects first; only pacing and the write count
+        against the command time budget.
+        """
+        pacers: tuple[WritePacer, ...] = (
+            self._pacer,
+            async_get_adapter_pacer(self._hass, self.adapter_source),
+        )
+        # Выдерживаем выученный интервал вместо фиксированной паузы
+        await async_wait(*pacers)
+        try:
+            started = time.monotonic()
+            await self._client.write_gatt_char(self._write_uuid, data, response)
+            if response:
+                self._latency.add(time.monotonic() - started)
+            self._commands_sent += 1
+        except Exception:
+            for pacer in pacers:
+                pacer.record_failure()
+            LOGGER.debug("%s: write failed, gap raised to %.3fs", self.name, self._pacer.gap)
+            raise
+        for pacer in pacers:
+            pacer.record_success()
+
+    @property
+    def _static_mode(self) -> bool:
+        """True when neither an effect nor a scene is active."""
+        return self._last_effect is None and self._last_scene is None
+
+    async def apply_state(
+        self,
+        power: bool | None = None,
+        rgb: Tuple[int, int, int] | None = None,
+        brightness: int | None = None,
+        effect: int | None = None,
+        scene: int | None = None,
+        speed: int | None = None,
+        static: bool = False,
+    ) -> int:
+        """
+        Apply a compound state change with the minimal frame sequence.
+
+        Frames already in place on the strip are skipped by the write filter
+        (until the resend interval passes), and the rest are queued at once
+        so the writer ships them in one connection critical section.
+        static=True (or rgb without effect/scene) selects static color;
+        effect ids start at 0 (auto play). Returns the number of frames queued.
+        """
+        frames = self._state_frames(power, rgb, brightness, effect, scene, speed, static)
+        queued = await self._async_send_frames(frames)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s: apply_state sent %d of %d frame(s)", self.name, queued, len(frames))
+        return queued
+
+    def _state_frames(
+        self,
+        power: bool | None = None,
+        rgb: Tuple[int, int, int] | None = None,
+        brightness: int | None = None,
+        effect: int | None = None,
+        scene: int | None = None,
+        speed: int | None = None,
+        static: bool = False,
+    ) -> list[tuple[bytes, str]]:
+        """Update the cached state and return the frames that set it."""
+        frames: list[tuple[bytes, str]] = []
+        # После анимации яркость и цвет на ленте не совпадают с кэшем;
+        # при выключении восстановление откладывается до включения
+        resync = self._color_streamed and power is not False
+        if resync:
+            self._color_streamed = False
+
+        # Выбор режима или выключение завершает режим микрофона тем же пакетом
+        if self._mic_enabled and (
+            power is False or rgb is not None or effect is not None or scene is not None or static
+        ):
+            frames.append((mic_frame(False), CHANNEL_MIC))
+            self._mic_enabled = False
+
+        # Кадры, уже применённые на ленте, отбрасывает фильтр записей
+        if power is False:
+            frames.append((TURN_OFF_CMD, CHANNEL_POWER))
+            self._is_on = False
+        elif power:
+            frames.append((TURN_ON_CMD, CHANNEL_POWER))
+            self._is_on = True
+
+        if brightness is not None or resync:
+            value = self._brightness if brightness is None else max(1, min(int(brightness), 255))
+            self._brightness = value
+            frames.append((brightness_frame(round(value * 100 / 255)), CHANNEL_BRIGHTNESS))
+            # Яркость в статичном режиме применяется вместе с цветом
+            selects_mode = rgb is not None or effect is not None or scene is not None or static
+            if not selects_mode and self._static_mode:
+                frames.append((color_frame(*self._rgb_color), CHANNEL_COLOR))
+
+        if scene is not None:
+            scene_id = max(1, min(int(scene), 28))
+            frames.append((scene_frame(scene_id), CHANNEL_EFFECT))
+            self._last_scene = scene_id
+            self._last_effect = None
+            self._effect_key = self._mode_key(KIND_SCENE, scene_id)
+        elif effect is not None:
+            frames.append((effect_frame(effect), CHANNEL_EFFECT))
+            self._last_effect = effect
+            self._last_scene = None
+            self._effect_key = self._mode_key(KIND_EFFECT, effect)
+        elif rgb is not None or static:
+            if rgb is not None:
+                self._rgb_color = tuple(int(max(0, min(255, c))) for c in rgb)  # type: ignore[assignment]
+            frames.append((color_frame(*self._rgb_color), CHANNEL_COLOR))
+            self._last_effect = None
+            self._last_scene = None
+            self._effect_key = "none"
+
+        if speed is not None:
+            self._effect_speed = max(0, min(int(speed), 100))
+            frames.append((speed_frame(self._effect_speed), CHANNEL_SPEED))
+        return frames
+
+    async def _async_send_frames(self, frames: list[tuple[bytes, str]]) -> int:
+        """Queue frames in one loop step, wait for them and publish the new state.
+
+        Returns the number of frames queued after the write filter.
+        """
+        self._cancel_animation()
+        # Все кадры в очередь за один шаг цикла, без ожидания между ними;
+        # фильтр видит уже поставленные кадры пакета (например, выключение микрофона)
+        futures = [
+            self._enqueue(data, channel)
+            for data, channel in frames
+            if not self._is_redundant(data, channel)
+        ]
+        if futures:
+            await asyncio.gather(*futures)
+        if frames:
+            self._save_state()
+        self._async_notify()
+        return len(futures)
+
+    @callback
+    def _cancel_animation(self) -> None:
+        """Any command other than an animation frame ends the running transition."""
+        async_get_animator(self._hass).async_cancel(self)
+
+    def stream_color(self, rgb: Tuple[int, int, int]) -> bool:
+        """
+        Queue a transient animation frame without touching the saved state.
+
+        Brightness is baked into the frame color, so the first frame also
+        switches the strip on at full hardware brightness; the next
+        apply_state() restores the cached brightness and color. Does not
+        wait for the write. If the previous frame has not been sent yet it
+        is replaced (the link can't keep up) and False is returned.
+        """
+        frames = []
+        first_frame = not self._color_streamed
+        if first_frame:
+            if self._mic_enabled:
+                frames.append((mic_frame(False), CHANNEL_MIC))
+                self._mic_enabled = False
+            if not self._is_on:
+                frames.append((TURN_ON_CMD, CHANNEL_POWER))
+                self._is_on = True
+            frames.append((brightness_frame(100), CHANNEL_BRIGHTNESS))
+        dropped = CHANNEL_COLOR in self._queue
+        if dropped:
+            self._dropped_stream_frames += 1
+        frames.append((color_frame(*rgb), CHANNEL_COLOR))
+        for data, channel in frames:
+            future = self._enqueue(data, channel)
+            # Ошибки кадров анимации не важны: следующий кадр заменит этот
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._last_effect = None
+        self._last_scene = None
+        self._effect_key = "none"
+        self._color_streamed = True
+        if first_frame:
+            # Подписчики узнают о начале перехода; конец сообщит apply_state()
+            self._async_notify()
+        return not dropped
+
+    @property
+    def dropped_stream_frames(self) -> int:
+        return self._dropped_stream_frames
+
     async def turn_on(self):
         """Turn on the light - команда: 7E 04 04 01 FF FF FF 00 EF"""
-        await self._write(TURN_ON_CMD)
+        await self._write(TURN_ON_CMD, CHANNEL_POWER)
         self._is_on = True
-        await self._async_save_state()
+        self._save_state()
+        self._async_notify()
 
-    @retry_bluetooth_connection_error
     async def turn_off(self):
         """Turn off the light - команда: 7E 04 04 00 FF FF FF 00 EF"""
-        await self._write(TURN_OFF_CMD)
+        await self._write(TURN_OFF_CMD, CHANNEL_POWER)
         self._is_on = False
-        await self._async_save_state()
+        # Вместе с лентой выключается и режим микрофона
+        self._mic_enabled = False
+        self._save_state()
+        self._async_notify()
 
-    @retry_bluetooth_connection_error
     async def set_brightness(self, value: int):
         """
         Set brightness (0-255).
@@ -261,16 +1057,16 @@ class BLEDOMInstance:
         percent = round(self._brightness * 100 / 255)
         
         # Отправляем команду яркости
-        await self._write([0x7E, 0x04, 0x01, percent, 0xFF, 0xFF, 0xFF, 0x00, 0xEF])
-        await asyncio.sleep(0.1)
+        await self._write(brightness_frame(percent), CHANNEL_BRIGHTNESS)
         
         # Затем устанавливаем цвет
         r, g, b = self._rgb_color
-        await self._write([0x7E, 0x07, 0x05, 0x03, r, g, b, 0x10, 0xEF])
+        await self._write(color_frame(r, g, b), CHANNEL_COLOR)
+        self._color_streamed = False
         
-        await self._async_save_state()
+        self._save_state()
+        self._async_notify()
 
-    @retry_bluetooth_connection_error
     async def set_color(self, rgb: Tuple[int, int, int], brightness: int | None = None):
         """
         Set RGB color.
@@ -283,32 +1079,38 @@ class BLEDOMInstance:
         self._rgb_color = (int(r), int(g), int(b))
 
         # Правильная команда RGB из APK
-        await self._write([0x7E, 0x07, 0x05, 0x03, r, g, b, 0x10, 0xEF])
+        await self._write(color_frame(r, g, b), CHANNEL_COLOR)
+        self._last_effect = None
+        self._last_scene = None
+        self._effect_key = "none"
+        self._color_streamed = False
 
         self._is_on = True
-        await self._async_save_state()
+        self._save_state()
+        self._async_notify()
 
-    @retry_bluetooth_connection_error
     async def set_effect(self, value: int):
         """
         Set effect.
         Команда: 7E 05 03 [EFFECT_ID] 06 FF FF 00 EF
         """
         try:
-            await self._ensure_connected()
-            if value in (0x00, None):
+            if value is None:
                 await self.set_color(self._rgb_color, self._brightness)
                 self._last_effect = None
                 return
             
             # Правильная команда эффекта из APK
-            await self._write([0x7E, 0x05, 0x03, value, 0x06, 0xFF, 0xFF, 0x00, 0xEF])
+            await self._write(effect_frame(value), CHANNEL_EFFECT)
             self._last_effect = value
+            self._last_scene = None
+            self._effect_key = self._mode_key(KIND_EFFECT, value)
+            self._save_state()
+            self._async_notify()
             LOGGER.debug("%s: set effect 0x%02X", self.name, value)
         except Exception as e:
             LOGGER.error("%s: set_effect error: %s", self.name, e)
 
-    @retry_bluetooth_connection_error
     async def set_scene(self, scene_id: int):
         """
         Set scene (1-28).
@@ -316,17 +1118,19 @@ class BLEDOMInstance:
         ВАЖНО: Сцены используют ДРУГУЮ команду (0x31 вместо 0x03)!
         """
         try:
-            await self._ensure_connected()
             scene_id = max(1, min(int(scene_id), 28))
             
             # Правильная команда сцены из APK
-            await self._write([0x7E, 0x05, 0x31, scene_id, 0x07, 0xFF, 0xFF, 0x01, 0xEF])
-            self._last_effect = scene_id
+            await self._write(scene_frame(scene_id), CHANNEL_EFFECT)
+            self._last_effect = None
+            self._last_scene = scene_id
+            self._effect_key = self._mode_key(KIND_SCENE, scene_id)
+            self._save_state()
+            self._async_notify()
             LOGGER.debug("%s: set scene %d", self.name, scene_id)
         except Exception as e:
             LOGGER.error("%s: set_scene error: %s", self.name, e)
 
-    @retry_bluetooth_connection_error
     async def set_effect_speed(self, speed: int):
         """
         Set effect speed (0-100).
@@ -334,10 +1138,11 @@ class BLEDOMInstance:
         """
         s = max(0, min(int(speed), 100))
         self._effect_speed = s
-        await self._write([0x7E, 0x04, 0x02, s, 0xFF, 0xFF, 0xFF, 0x00, 0xEF])
+        await self._write(speed_frame(s), CHANNEL_SPEED)
+        self._save_state()
+        self._async_notify()
         LOGGER.debug("%s: set speed %d", self.name, s)
 
-    @retry_bluetooth_connection_error
     async def set_effect_brightness(self, brightness: int):
         """
         Set effect brightness (0-100) without switching to RGB mode.
@@ -346,10 +1151,12 @@ class BLEDOMInstance:
         ВАЖНО: Эта команда меняет яркость текущего эффекта без переключения в RGB режим!
         """
         b = max(0, min(int(brightness), 100))
-        await self._write([0x7E, 0x04, 0x01, b, 0xFF, 0xFF, 0xFF, 0x00, 0xEF])
+        await self._write(brightness_frame(b), CHANNEL_BRIGHTNESS)
+        self._effect_brightness = b
+        self._save_state()
+        self._async_notify()
         LOGGER.debug("%s: set effect brightness %d", self.name, b)
 
-    @retry_bluetooth_connection_error
     async def set_microphone(self, enabled: bool):
         """
         Enable/disable microphone mode.
@@ -360,23 +1167,25 @@ class BLEDOMInstance:
         if enabled:
             # Сначала выключаем эффект (устанавливаем статичный цвет)
             await self.set_color(self._rgb_color, self._brightness)
-            await asyncio.sleep(0.2)
         
-        value = 0x01 if enabled else 0x00
-        await self._write([0x7E, 0x04, 0x07, value, 0xFF, 0xFF, 0xFF, 0x00, 0xEF])
+        await self._write(mic_frame(enabled), CHANNEL_MIC)
+        self._mic_enabled = enabled
+        self._save_state()
+        self._async_notify()
         LOGGER.debug("%s: microphone %s", self.name, "enabled" if enabled else "disabled")
 
-    @retry_bluetooth_connection_error
     async def set_microphone_sensitivity(self, sensitivity: int):
         """
         Set microphone sensitivity (0-100).
         Команда: 7E 04 06 [SENSITIVITY] FF FF FF 00 EF
         """
         s = max(0, min(int(sensitivity), 100))
-        await self._write([0x7E, 0x04, 0x06, s, 0xFF, 0xFF, 0xFF, 0x00, 0xEF])
+        await self._write(mic_sensitivity_frame(s), CHANNEL_MIC_SENSITIVITY)
+        self._mic_sensitivity = s
+        self._save_state()
+        self._async_notify()
         LOGGER.debug("%s: microphone sensitivity %d", self.name, s)
 
-    @retry_bluetooth_connection_error
     async def set_microphone_eq_mode(self, mode: int):
         """
         Set microphone EQ mode (0x80-0x87).
@@ -384,11 +1193,232 @@ class BLEDOMInstance:
         где MODE = 0x80-0x87 (128-135)
         """
         m = max(0x80, min(int(mode), 0x87))
-        await self._write([0x7E, 0x07, 0x03, m, 0x04, 0xFF, 0xFF, 0x00, 0xEF])
+        await self._write(eq_frame(m), CHANNEL_MIC_EQ)
+        self._mic_eq_mode = m
+        self._save_state()
+        self._async_notify()
         LOGGER.debug("%s: microphone EQ mode 0x%02X", self.name, m)
 
+    def _music_on_frames(
+        self,
+        rgb: Tuple[int, int, int] | None = None,
+        sensitivity: int | None = None,
+        eq_mode: int | None = None,
+    ) -> list[tuple[bytes, str]]:
+        """Update the cache for microphone mode and return the frames needed."""
+        entering = not self._mic_enabled
+        color = self._rgb_color if rgb is None else tuple(int(max(0, min(255, c))) for c in rgb)
+        s = self._mic_sensitivity if sensitivity is None else max(0, min(int(sensitivity), 100))
+        m = self._mic_eq_mode if eq_mode is None else max(0x80, min(int(eq_mode), 0x87))
+
+        frames: list[tuple[bytes, str]] = []
+        if not self._is_on:
+            frames.append((TURN_ON_CMD, CHANNEL_POWER))
+            self._is_on = True
+        if self._color_streamed:
+            # Лента ещё показывает кадр анимации - возвращаем яркость из кэша
+            frames.append((brightness_frame(round(self._brightness * 100 / 255)), CHANNEL_BRIGHTNESS))
+        # Микрофон не работает поверх эффекта - нужен статичный цвет
+        if color != self._rgb_color or self._color_streamed or (entering and not self._static_mode):
+            frames.append((color_frame(*color), CHANNEL_COLOR))
+        self._rgb_color = color  # type: ignore[assignment]
+        self._color_streamed = False
+        if entering:
+            frames.append((mic_frame(True), CHANNEL_MIC))
+        if entering or s != self._mic_sensitivity:
+            frames.append((mic_sensitivity_frame(s), CHANNEL_MIC_SENSITIVITY))
+        if entering or m != self._mic_eq_mode:
+            frames.append((eq_frame(m), CHANNEL_MIC_EQ))
+        self._mic_sensitivity = s
+        self._mic_eq_mode = m
+
+        if entering:
+            # Запоминаем режим, чтобы вернуть его при выходе
+            self._mode_before_mic = self._effect_key
+            self._last_effect = None
+            self._last_scene = None
+            self._effect_key = "none"
+            self._mic_enabled = True
+        return frames
+
+    async def async_enter_music_mode(self) -> int:
+        """
+        Switch to microphone mode in one transaction.
+
+        Power, static color (the mic does not work over an effect), mic on,
+        sensitivity and EQ are queued together, so the writer sends them in
+        one connection critical section. Returns the number of frames queued.
+        """
+        queued = await self._async_send_frames(self._music_on_frames())
+        LOGGER.debug("%s: entered music mode (%d frame(s))", self.name, queued)
+        return queued
+
+    async def async_exit_music_mode(self) -> int:
+        """
+        Leave microphone mode and restore the previous mode from cached state.
+
+        Mic off and the effect, scene or color frame go out in one
+        transaction. Returns the number of frames queued.
+        """
+        if not self._mic_enabled:
+            return 0
+        frames: list[tuple[bytes, str]] = [(mic_frame(False), CHANNEL_MIC)]
+        entry = get_effect_catalog().get(self._mode_before_mic)
+        if entry is not None and entry.frame is not None:
+            frames.append((entry.frame, CHANNEL_EFFECT))
+            self._last_effect = entry.id if entry.kind == KIND_EFFECT else None
+            self._last_scene = entry.id if entry.kind == KIND_SCENE else None
+            self._effect_key = entry.key
+        else:
+            frames.append((color_frame(*self._rgb_color), CHANNEL_COLOR))
+        self._mic_enabled = False
+        queued = await self._async_send_frames(frames)
+        LOGGER.debug("%s: left music mode (%d frame(s))", self.name, queued)
+        return queued
+
+    # =========================================================
+    # Сверка состояния
+    # =========================================================
+    @callback
+    def _async_reconcile_due(self, _now) -> None:
+        self._unsub_reconcile = async_call_later(
+            self._hass, self._reconcile_interval, self._async_reconcile_due
+        )
+        async_get_reconciler(self._hass).async_request(self)
+
+    def _reconcile_frames(self) -> list[tuple[bytes, str]]:
+        """Frames that fully define the cached state (power, brightness, mode, speed)."""
+        if not self._is_on:
+            return [(TURN_OFF_CMD, CHANNEL_POWER)]
+        # Яркость ленты и яркость эффекта - одна команда: повторяем записанную,
+        # а без неё - ту, что соответствует режиму
+        brightness = self._written_brightness
+        if brightness is None:
+            if self._static_mode or self._mic_enabled:
+                brightness = brightness_frame(round(self._brightness * 100 / 255))
+            else:
+                brightness = brightness_frame(self._effect_brightness)
+        frames: list[tuple[bytes, str]] = [
+            (TURN_ON_CMD, CHANNEL_POWER),
+            (brightness, CHANNEL_BRIGHTNESS),
+        ]
+        if self._mic_enabled:
+            frames += [
+                (color_frame(*self._rgb_color), CHANNEL_COLOR),
+                (mic_frame(True), CHANNEL_MIC),
+                (mic_sensitivity_frame(self._mic_sensitivity), CHANNEL_MIC_SENSITIVITY),
+                (eq_frame(self._mic_eq_mode), CHANNEL_MIC_EQ),
+            ]
+        elif self._static_mode:
+            frames.append((color_frame(*self._rgb_color), CHANNEL_COLOR))
+        else:
+            if self._last_scene is not None:
+                frames.append((scene_frame(self._last_scene), CHANNEL_EFFECT))
+            else:
+                frames.append((effect_frame(self._last_effect), CHANNEL_EFFECT))  # type: ignore[arg-type]
+            frames.append((speed_frame(self._effect_speed), CHANNEL_SPEED))
+        return frames
+
+    async def async_reconcile(self) -> int:
+        """
+        Re-send the cached state, bypassing the write filter.
+
+        Corrects a strip that browned out or was switched by its IR remote.
+        A persistent link is not opened here (the reconnect triggers its own
+        reconciliation); on-demand strips connect at background priority.
+        Returns the number of frames queued.
+        """
+        if not self.reconcile_ready:
+            return 0
+        if not (self._client and self._client.is_connected):
+            if not self._on_demand:
+                return 0
+            await self._ensure_connected(PRIORITY_BACKGROUND)
+        frames = self._reconcile_frames()
+        await asyncio.gather(*(self._enqueue(data, channel) for data, channel in frames))
+        self._reconciliations += 1
+        return len(frames)
+
+    # =========================================================
+    # Снимки состояния
+    # =========================================================
+    def snapshot(self) -> DeviceSnapshot:
+        """Capture the cached device state."""
+        return DeviceSnapshot(
+            is_on=self._is_on,
+            rgb=self._rgb_color,
+            brightness=self._brightness,
+            effect=self._mode_before_mic if self._mic_enabled else self._effect_key,
+            speed=self._effect_speed,
+            effect_brightness=self._effect_brightness,
+            mic_enabled=self._mic_enabled,
+            mic_sensitivity=self._mic_sensitivity,
+            mic_eq_mode=self._mic_eq_mode,
+        )
+
+    async def async_apply_snapshot(self, snapshot: DeviceSnapshot) -> int:
+        """
+        Bring the strip to a captured state in one transaction.
+
+        As with apply_state(), frames already in place are dropped by the
+        write filter. Returns the number of frames queued.
+        """
+        if not snapshot.is_on:
+            return await self._async_send_frames(self._state_frames(power=False))
+
+        entry = get_effect_catalog().get(snapshot.effect)
+        if entry is not None and entry.frame is None:
+            entry = None
+        if snapshot.mic_enabled:
+            frames = self._state_frames(
+                power=True, brightness=snapshot.brightness, speed=snapshot.speed
+            )
+            frames += self._music_on_frames(
+                snapshot.rgb, snapshot.mic_sensitivity, snapshot.mic_eq_mode
+            )
+            self._mode_before_mic = entry.key if entry else "none"
+        elif entry is not None:
+            frames = self._state_frames(
+                power=True, brightness=snapshot.brightness, speed=snapshot.speed, **entry.state_args
+            )
+            # Цвет пригодится при возврате в статичный режим
+            self._rgb_color = tuple(snapshot.rgb)  # type: ignore[assignment]
+            if snapshot.effect_brightness != self._effect_brightness:
+                self._effect_brightness = max(0, min(int(snapshot.effect_brightness), 100))
+                frames.append((brightness_frame(self._effect_brightness), CHANNEL_BRIGHTNESS))
+        else:
+            frames = self._state_frames(
+                power=True, rgb=snapshot.rgb, brightness=snapshot.brightness, speed=snapshot.speed
+            )
+        queued = await self._async_send_frames(frames)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s: snapshot applied with %d frame(s)", self.name, queued)
+        return queued
+
     async def stop(self):
         """Stop and disconnect."""
-        await self._async_save_state()
+        self._stopped = True
+        self._cancel_animation()
+        if self._writer_task and not self._writer_task.done():
+            self._writer_task.cancel()
+        # Неотправленные команды уже не уйдут - их ожидающие получают ошибку
+        for _data, waiters, _enqueued in self._queue.values():
+            self._fail_waiters(waiters)
+        self._queue.clear()
+        self._cancel_idle_disconnect()
+        if self._unsub_probe is not None:
+            self._unsub_probe()
+            self._unsub_probe = None
+        if self._unsub_reconcile is not None:
+            self._unsub_reconcile()
+            self._unsub_reconcile = None
+        async_get_reconciler(self._hass).async_cancel(self)
+        self._expected_disconnect = True
+        self._unsub_advertisement()
+        if self._reconnect_task and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+        self._save_state()
+        await self._store.async_flush()
+        self._connections.async_mark_disconnected(self.address)
         if self._client and self._client.is_connected:
             await self._client.disconnect()
@@ -0,0 +1,29 @@
+"""Round-trip latency statistics for MELK LED Strip commands."""
+from __future__ import annotations
+
+import math
+from collections import deque
+
+# Сколько последних замеров учитывается в процентилях
+LATENCY_WINDOW = 100
+
+
+class LatencyHistogram:
+    """Rolling window of round-trip samples with percentile lookup."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile of the window in milliseconds, None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return round(ordered[rank - 1] * 1000, 1)
@@ -8,6 +8,7 @@ from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
     ATTR_RGB_COLOR,
     ATTR_EFFECT,
+    ATTR_TRANSITION,
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
@@ -16,13 +17,11 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers import device_registry
 
-from .const import (
-    DOMAIN,
-    ALL_EFFECTS_MAP,
-    ALL_EFFECT_LABELS,
-    SCENES_MAP,
-)
+from .animation import MODE_FADE, async_animate
+from .const import DOMAIN
+from .effects import get_effect_catalog
 from .elkbledom import BLEDOMInstance
+from .zone import MELKLEDZone
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,13 +30,13 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up MELK LED light from config entry."""
-    instance: BLEDOMInstance = hass.data[DOMAIN][entry.entry_id]
-    light_entity = MELKLEDLight(instance, entry.data["name"], entry.entry_id)
-    
-    # Сохраняем ссылку на light entity в instance для доступа из switch
-    instance._light_entity = light_entity
-    
-    async_add_entities([light_entity])
+    obj = hass.data[DOMAIN][entry.entry_id]
+    if isinstance(obj, MELKLEDZone):
+        async_add_entities([MELKLEDZoneLight(obj, entry.data["name"], entry.entry_id)])
+        return
+
+    instance: BLEDOMInstance = obj
+    async_add_entities([MELKLEDLight(instance, entry.data["name"], entry.entry_id)])
 
 
 class MELKLEDLight(RestoreEntity, LightEntity):
@@ -45,58 +44,51 @@ class MELKLEDLight(RestoreEntity, LightEntity):
 
     _attr_supported_color_modes = {ColorMode.RGB}
     _attr_color_mode = ColorMode.RGB
-    _attr_supported_features = LightEntityFeature.EFFECT
+    _attr_supported_features = LightEntityFeature.EFFECT | LightEntityFeature.TRANSITION
     # Указываем, что состояние предполагаемое (assumed)
     # потому что Bluetooth устройство не может отправлять состояние обратно
     _attr_assumed_state = True
+    # Состояние обновляется по подписке на экземпляр устройства
+    _attr_should_poll = False
 
     def __init__(self, instance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = instance
         self._attr_name = name
         self._entry_id = entry_id
         self._attr_unique_id = f"{self._instance.address}_light"
-
-        # Текущий эффект (ключ из const)
-        self._current_effect_key: str = "none"
-        
-        # Последний эффект перед микрофоном (для восстановления)
-        self._last_effect_before_mic: str = "none"
         
         # Флаг, что состояние восстановлено
         self._restored = False
 
-        # Подготовим красивые списки для UI (эффекты + сцены)
-        pretty = []
-        for key in ["none"] + [k for k in ALL_EFFECTS_MAP.keys() if k != "none"]:
-            pretty.append(ALL_EFFECT_LABELS.get(key, key))
-
-        self._pretty_effect_list = pretty
-        self._key2pretty = {k: ALL_EFFECT_LABELS.get(k, k) for k in ALL_EFFECTS_MAP.keys()}
-        self._pretty2key = {v: k for k, v in self._key2pretty.items()}
+        # Общий каталог эффектов и сцен (один на все сущности)
+        self._catalog = get_effect_catalog()
     
     async def async_added_to_hass(self) -> None:
         """Restore state when entity is added to hass."""
         await super().async_added_to_hass()
+        self.async_on_remove(self._instance.async_subscribe(self.async_write_ha_state))
         
         # Восстанавливаем последнее состояние
         last_state = await self.async_get_last_state()
         if last_state:
-            _LOGGER.info("Restoring last state: %s", last_state.state)
+            _LOGGER.debug("Restoring last state: %s", last_state.state)
             
             # Восстанавливаем состояние ON/OFF
             self._instance._is_on = last_state.state == "on"
             
-            # Восстанавливаем эффект
-            if last_state.attributes.get(ATTR_EFFECT):
-                effect_label = last_state.attributes[ATTR_EFFECT]
-                self._current_effect_key = self._pretty2key.get(effect_label, "none")
-                _LOGGER.info("Restored effect: %s", effect_label)
+            # Эффект хранится в экземпляре; атрибут - для старых сохранений
+            effect_label = last_state.attributes.get(ATTR_EFFECT)
+            if effect_label and self._instance.effect_key == "none":
+                entry = self._catalog.from_label(effect_label)
+                if entry is not None:
+                    self._instance.restore_effect_key(entry.key)
+                    _LOGGER.debug("Restored effect: %s", effect_label)
             
             self._restored = True
-            _LOGGER.info("State restored: is_on=%s, effect=%s", 
-                        self._instance._is_on, self._current_effect_key)
+            _LOGGER.debug("State restored: is_on=%s, effect=%s", 
+                        self._instance.is_on, self._instance.effect_key)
         else:
-            _LOGGER.info("No previous state found, using defaults")
+            _LOGGER.debug("No previous state found, using defaults")
 
     @property
     def is_on(self):
@@ -116,11 +108,11 @@ class MELKLEDLight(RestoreEntity, LightEntity):
 
     @property
     def effect(self) -> str | None:
-        return self._key2pretty.get(self._current_effect_key, "none")
+        return self._catalog.label(self._instance.effect_key)
 
     @property
-    def effect_list(self) -> list[str] | None:
-        return self._pretty_effect_list
+    def effect_list(self) -> tuple[str, ...]:
+        return self._catalog.labels
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -131,155 +123,176 @@ class MELKLEDLight(RestoreEntity, LightEntity):
             model="LED Strip Controller",
             connections={(device_registry.CONNECTION_NETWORK_MAC, self._instance.address)},
         )
-    
-    def save_state_before_microphone(self) -> None:
-        """Save current effect before enabling microphone."""
-        self._last_effect_before_mic = self._current_effect_key
-        _LOGGER.info("Saved effect before microphone: %s", self._last_effect_before_mic)
-    
-    async def restore_state_after_microphone(self) -> None:
-        """Restore effect after disabling microphone."""
-        if self._last_effect_before_mic and self._last_effect_before_mic != "none":
-            _LOGGER.info("Restoring effect after microphone: %s", self._last_effect_before_mic)
-            
-            # Восстанавливаем эффект
-            if self._last_effect_before_mic.startswith("scene_"):
-                scene_name = self._last_effect_before_mic[6:]
-                if scene_name in SCENES_MAP:
-                    scene_id = SCENES_MAP[scene_name]
-                    await self._instance.set_scene(scene_id)
-                    self._current_effect_key = self._last_effect_before_mic
-                    _LOGGER.info("Restored scene: %s (id=%d)", self._last_effect_before_mic, scene_id)
-            elif self._last_effect_before_mic in ALL_EFFECTS_MAP:
-                effect_id = ALL_EFFECTS_MAP[self._last_effect_before_mic]
-                await self._instance.set_effect(effect_id)
-                self._current_effect_key = self._last_effect_before_mic
-                _LOGGER.info("Restored effect: %s (0x%02X)", self._last_effect_before_mic, effect_id)
-        else:
-            # Нет эффекта - восстанавливаем статичный цвет
-            _LOGGER.info("Restoring static color after microphone")
-            await self._instance.set_color(self._instance.rgb_color, self._instance.brightness)
-            self._current_effect_key = "none"
-        
-        self.async_write_ha_state()
+
+    @staticmethod
+    def _effect_args(effect_key: str) -> dict[str, int] | None:
+        """Map an effect key to apply_state() arguments (effect or scene id)."""
+        entry = get_effect_catalog().get(effect_key)
+        return entry.state_args if entry else None
 
     async def async_turn_on(self, **kwargs):
         """Turn on the light with correct commands."""
-        _LOGGER.debug("Turn ON with kwargs: %s", kwargs)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Turn ON with kwargs: %s", kwargs)
+        transition = kwargs.pop(ATTR_TRANSITION, None)
         
+        effect_key = self._instance.effect_key
         # Если включаем без параметров - восстанавливаем последний режим
-        if not kwargs:
-            _LOGGER.info("Turning on without params - restoring last state")
-            await self._instance.turn_on()
-            
-            # Небольшая задержка после команды включения
-            import asyncio
-            await asyncio.sleep(0.2)
-            
-            # Восстанавливаем последний эффект или цвет
-            if self._current_effect_key and self._current_effect_key != "none":
-                _LOGGER.info("Restoring last effect: %s", self._current_effect_key)
-                
-                # Проверяем, это сцена или обычный эффект
-                if self._current_effect_key.startswith("scene_"):
-                    scene_name = self._current_effect_key[6:]
-                    if scene_name in SCENES_MAP:
-                        scene_id = SCENES_MAP[scene_name]
-                        await self._instance.set_scene(scene_id)
-                        _LOGGER.info("Restored scene: %s (id=%d)", self._current_effect_key, scene_id)
-                elif self._current_effect_key in ALL_EFFECTS_MAP:
-                    effect_id = ALL_EFFECTS_MAP[self._current_effect_key]
-                    await self._instance.set_effect(effect_id)
-                    _LOGGER.info("Restored effect: %s (0x%02X)", self._current_effect_key, effect_id)
-            else:
-                # Нет эффекта - восстанавливаем статичный цвет
-                _LOGGER.info("Restoring static color")
-                await self._instance.set_color(self._instance.rgb_color, self._instance.brightness)
-            
-            self.async_write_ha_state()
+        if not kwargs and not (transition and effect_key == "none"):
+            _LOGGER.debug("Turning on without params - restoring last state")
+            # Последний эффект/сцена или статичный цвет - одним пакетом с включением
+            args = self._effect_args(effect_key) or {"static": True}
+            await self._instance.apply_state(power=True, **args)
             return
         
-        # Если меняем эффект или цвет - выключаем микрофон
-        if ATTR_EFFECT in kwargs or ATTR_RGB_COLOR in kwargs:
-            # Получаем entity_id света из registry
-            if not hasattr(self, 'entity_id') or not self.entity_id:
-                _LOGGER.warning("Light entity_id not available yet")
-            else:
-                # Формируем entity_id микрофона
-                switch_entity_id = self.entity_id.replace("light.", "switch.") + "_microphone_mode"
-                _LOGGER.debug("Attempting to disable microphone: %s", switch_entity_id)
-                
-                if self.hass.states.get(switch_entity_id):
-                    _LOGGER.info("Auto-disabling microphone: %s", switch_entity_id)
-                    await self.hass.services.async_call(
-                        "switch", "turn_off",
-                        {"entity_id": switch_entity_id},
-                        blocking=False
-                    )
-                else:
-                    _LOGGER.warning("Microphone switch not found: %s (available entities: %s)", 
-                                  switch_entity_id, 
-                                  [e for e in self.hass.states.async_entity_ids() if 'microphone' in e])
+        # Плавный переход к цвету/яркости (эффекты переходом не анимируются)
+        if transition and ATTR_EFFECT not in kwargs and (
+            ATTR_RGB_COLOR in kwargs or effect_key == "none"
+        ):
+            async_animate(
+                self.hass, self._instance, MODE_FADE, transition,
+                rgb=kwargs.get(ATTR_RGB_COLOR), brightness=kwargs.get(ATTR_BRIGHTNESS),
+            )
+            return
+
+        # Включение и параметры уходят одним пакетом (только изменившиеся кадры);
+        # смена эффекта или цвета тем же пакетом выключает микрофон
+        args: dict = {"power": True, "brightness": kwargs.get(ATTR_BRIGHTNESS)}
+        if ATTR_EFFECT in kwargs:
+            # Эффект имеет приоритет над цветом
+            entry = self._catalog.from_label(kwargs[ATTR_EFFECT])
+            if entry is not None:
+                args.update(entry.state_args)
+                _LOGGER.debug("Applying effect: key=%s %s", entry.key, entry.state_args)
+        elif ATTR_RGB_COLOR in kwargs:
+            args["rgb"] = kwargs[ATTR_RGB_COLOR]
+
+        # Состояние сущности обновится по подписке
+        await self._instance.apply_state(**args)
+
+    async def async_turn_off(self, **kwargs):
+        """Turn off the light."""
+        _LOGGER.debug("Turning off light - saving current state")
         
-        # Включаем свет (только команда включения, без цвета)
-        await self._instance.turn_on()
+        # НЕ сбрасываем эффект - экземпляр хранит его для следующего включения
         
-        # Небольшая задержка после команды включения
-        import asyncio
-        await asyncio.sleep(0.2)
+        if kwargs.get(ATTR_TRANSITION):
+            # Затухание до чёрного, выключение - в конце перехода
+            async_animate(
+                self.hass, self._instance, MODE_FADE, kwargs[ATTR_TRANSITION], turn_off=True
+            )
+        else:
+            # Микрофон выключается тем же пакетом, что и лента
+            await self._instance.apply_state(power=False)
+
+
+class MELKLEDZoneLight(RestoreEntity, LightEntity):
+    """Zone of MELK LED strips controlled as one light."""
+
+    _attr_supported_color_modes = {ColorMode.RGB}
+    _attr_color_mode = ColorMode.RGB
+    _attr_supported_features = LightEntityFeature.EFFECT | LightEntityFeature.TRANSITION
+    _attr_assumed_state = True
+    # Состояние меняют только команды зоны - опрашивать нечего
+    _attr_should_poll = False
+    _attr_icon = "mdi:led-strip-variant"
+
+    def __init__(self, zone: MELKLEDZone, name: str, entry_id: str) -> None:
+        self._zone = zone
+        self._attr_name = name
+        self._entry_id = entry_id
+        self._attr_unique_id = f"zone_{entry_id}_light"
+        self._attr_is_on = False
+        self._attr_brightness = 255
+        self._attr_rgb_color = (255, 255, 255)
+        self._current_effect_key: str = "none"
+        self._catalog = get_effect_catalog()
+
+    async def async_added_to_hass(self) -> None:
+        """Restore state when entity is added to hass."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state:
+            self._attr_is_on = last_state.state == "on"
+            if last_state.attributes.get(ATTR_BRIGHTNESS) is not None:
+                self._attr_brightness = last_state.attributes[ATTR_BRIGHTNESS]
+            if last_state.attributes.get(ATTR_RGB_COLOR):
+                self._attr_rgb_color = tuple(last_state.attributes[ATTR_RGB_COLOR])
+            if last_state.attributes.get(ATTR_EFFECT):
+                entry = self._catalog.from_label(last_state.attributes[ATTR_EFFECT])
+                self._current_effect_key = entry.key if entry else "none"
+
+    @property
+    def effect(self) -> str | None:
+        return self._catalog.label(self._current_effect_key)
+
+    @property
+    def effect_list(self) -> tuple[str, ...]:
+        return self._catalog.labels
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {"members": self._zone.members}
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, f"zone_{self._entry_id}")},
+            name=self._attr_name,
+            manufacturer="MELK",
+            model="LED Strip Zone",
+        )
+
+    async def _async_apply(self, **args) -> None:
+        """Send one state to all member strips (their entities update by subscription)."""
+        await self._zone.async_apply_state(**args)
+
+    async def async_turn_on(self, **kwargs):
+        """Turn on all strips of the zone at once."""
+        transition = kwargs.pop(ATTR_TRANSITION, None)
+        if transition and ATTR_EFFECT not in kwargs and (
+            ATTR_RGB_COLOR in kwargs or self._current_effect_key == "none"
+        ):
+            # Один и тот же переход на всех лентах зоны
+            self._attr_brightness = kwargs.get(ATTR_BRIGHTNESS, self._attr_brightness)
+            self._attr_rgb_color = tuple(kwargs.get(ATTR_RGB_COLOR, self._attr_rgb_color))
+            self._current_effect_key = "none"
+            await self._zone.async_animate(
+                MODE_FADE, transition, self._attr_rgb_color, self._attr_brightness
+            )
+            self._attr_is_on = True
+            self.async_write_ha_state()
+            return
+
+        args: dict = {"power": True}
+        if ATTR_BRIGHTNESS in kwargs:
+            self._attr_brightness = kwargs[ATTR_BRIGHTNESS]
+            args["brightness"] = kwargs[ATTR_BRIGHTNESS]
 
-        # Теперь применяем параметры в правильном порядке
         if ATTR_EFFECT in kwargs:
-            # Сначала эффект (он имеет приоритет)
-            pretty_name = kwargs[ATTR_EFFECT]
-            effect_key = self._pretty2key.get(pretty_name, pretty_name)
-            
-            # Проверяем, это сцена или обычный эффект
-            if effect_key.startswith("scene_"):
-                # Это сцена - используем другую команду
-                scene_name = effect_key[6:]  # Убираем префикс "scene_"
-                if scene_name in SCENES_MAP:
-                    scene_id = SCENES_MAP[scene_name]
-                    await self._instance.set_scene(scene_id)
-                    self._current_effect_key = effect_key
-                    _LOGGER.debug("Applied scene: key=%s id=%d", effect_key, scene_id)
-            elif effect_key in ALL_EFFECTS_MAP:
-                # Обычный эффект
-                effect_id = ALL_EFFECTS_MAP[effect_key]
-                await self._instance.set_effect(effect_id)
-                self._current_effect_key = effect_key
-                _LOGGER.debug("Applied effect: key=%s id=0x%02X", effect_key, effect_id)
+            entry = self._catalog.from_label(kwargs[ATTR_EFFECT])
+            if entry is not None:
+                args.update(entry.state_args)
+                self._current_effect_key = entry.key
         elif ATTR_RGB_COLOR in kwargs:
-            # Если нет эффекта, но есть цвет - применяем цвет
-            rgb = kwargs[ATTR_RGB_COLOR]
-            brightness = kwargs.get(ATTR_BRIGHTNESS, self._instance.brightness)
-            await self._instance.set_color(rgb, brightness)
+            self._attr_rgb_color = tuple(kwargs[ATTR_RGB_COLOR])
+            args["rgb"] = self._attr_rgb_color
             self._current_effect_key = "none"
-        elif ATTR_BRIGHTNESS in kwargs:
-            # Только яркость - применяем к текущему состоянию
-            await self._instance.set_brightness(kwargs[ATTR_BRIGHTNESS])
+        elif not kwargs:
+            # Без параметров - восстанавливаем режим зоны
+            args.update(MELKLEDLight._effect_args(self._current_effect_key) or {"static": True})
+            if self._current_effect_key == "none":
+                args["rgb"] = self._attr_rgb_color
 
+        await self._async_apply(**args)
+        self._attr_is_on = True
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
-        """Turn off the light."""
-        _LOGGER.info("Turning off light - saving current state")
-        
-        # НЕ сбрасываем эффект - сохраняем для следующего включения
-        # self._current_effect_key остаётся как есть
-        
-        # Выключаем микрофон если он был включен
-        if hasattr(self, 'entity_id') and self.entity_id:
-            switch_entity_id = self.entity_id.replace("light.", "switch.") + "_microphone_mode"
-            if self.hass.states.get(switch_entity_id):
-                mic_state = self.hass.states.get(switch_entity_id)
-                if mic_state and mic_state.state == "on":
-                    _LOGGER.info("Auto-disabling microphone on light turn off: %s", switch_entity_id)
-                    await self.hass.services.async_call(
-                        "switch", "turn_off",
-                        {"entity_id": switch_entity_id},
-                        blocking=False
-                    )
-        
-        await self._instance.turn_off()
+        """Turn off all strips of the zone at once."""
+        if kwargs.get(ATTR_TRANSITION):
+            await self._zone.async_animate(MODE_FADE, kwargs[ATTR_TRANSITION], turn_off=True)
+        else:
+            await self._async_apply(power=False)
+        self._attr_is_on = False
         self.async_write_ha_state()
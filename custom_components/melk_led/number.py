@@ -34,13 +34,21 @@ class MELKLEDMicrophoneSensitivity(NumberEntity):
     _attr_native_step = 1
     _attr_mode = NumberMode.SLIDER
     _attr_icon = "mdi:microphone"
+    _attr_should_poll = False
 
     def __init__(self, instance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = instance
         self._attr_name = f"{name} Microphone Sensitivity"
         self._entry_id = entry_id
         self._attr_unique_id = f"{self._instance.address}_mic_sensitivity"
-        self._attr_native_value = 50  # Default
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device state changes."""
+        self.async_on_remove(self._instance.async_subscribe(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int:
+        return self._instance.mic_sensitivity
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -56,8 +64,6 @@ class MELKLEDMicrophoneSensitivity(NumberEntity):
         """Set microphone sensitivity (0-100)."""
         sensitivity = int(value)
         await self._instance.set_microphone_sensitivity(sensitivity)
-        self._attr_native_value = sensitivity
-        self.async_write_ha_state()
 
 
 class MELKLEDEffectSpeed(NumberEntity):
@@ -68,13 +74,21 @@ class MELKLEDEffectSpeed(NumberEntity):
     _attr_native_step = 1
     _attr_mode = NumberMode.SLIDER
     _attr_icon = "mdi:speedometer"
+    _attr_should_poll = False
 
     def __init__(self, instance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = instance
         self._attr_name = f"{name} Effect Speed"
         self._entry_id = entry_id
         self._attr_unique_id = f"{self._instance.address}_effect_speed"
-        self._attr_native_value = 50  # Default
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device state changes."""
+        self.async_on_remove(self._instance.async_subscribe(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int:
+        return self._instance.effect_speed
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -90,8 +104,6 @@ class MELKLEDEffectSpeed(NumberEntity):
         """Set effect speed (0-100)."""
         speed = int(value)
         await self._instance.set_effect_speed(speed)
-        self._attr_native_value = speed
-        self.async_write_ha_state()
 
 
 class MELKLEDEffectBrightness(NumberEntity):
@@ -102,13 +114,21 @@ class MELKLEDEffectBrightness(NumberEntity):
     _attr_native_step = 1
     _attr_mode = NumberMode.SLIDER
     _attr_icon = "mdi:brightness-6"
+    _attr_should_poll = False
 
     def __init__(self, instance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = instance
         self._attr_name = f"{name} Effect Brightness"
         self._entry_id = entry_id
         self._attr_unique_id = f"{self._instance.address}_effect_brightness"
-        self._attr_native_value = 100  # Default
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device state changes."""
+        self.async_on_remove(self._instance.async_subscribe(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int:
+        return self._instance.effect_brightness
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -124,5 +144,3 @@ class MELKLEDEffectBrightness(NumberEntity):
         """Set effect brightness (0-100) without switching to RGB mode."""
         brightness = int(value)
         await self._instance.set_effect_brightness(brightness)
-        self._attr_native_value = brightness
-        self.async_write_ha_state()
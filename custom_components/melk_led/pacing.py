@@ -0,0 +1,87 @@
+"""Adaptive inter-command pacing for MELK LED Strip."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_ADAPTER_PACERS
+
+# Стартовые значения для устройства: как старая фиксированная пауза 0.15 с
+DEVICE_INITIAL_GAP = 0.15
+DEVICE_MIN_GAP = 0.02
+DEVICE_MAX_GAP = 1.0
+
+# Адаптер/прокси общий для многих лент, поэтому стартуем с малого интервала
+ADAPTER_INITIAL_GAP = 0.02
+ADAPTER_MIN_GAP = 0.0
+ADAPTER_MAX_GAP = 0.5
+
+# Успех медленно сокращает интервал, ошибка быстро увеличивает
+TIGHTEN_FACTOR = 0.9
+BACKOFF_FACTOR = 2.0
+BACKOFF_STEP = 0.05
+
+
+class WritePacer:
+    """Learn the minimum safe gap between consecutive BLE writes."""
+
+    def __init__(self, initial: float, minimum: float, maximum: float) -> None:
+        self._gap = initial
+        self._min = minimum
+        self._max = maximum
+        self._last_write = 0.0
+
+    @property
+    def gap(self) -> float:
+        return self._gap
+
+    def ready_at(self) -> float:
+        """Monotonic time when the next write is allowed."""
+        return self._last_write + self._gap
+
+    def reserve(self, at: float) -> None:
+        """Claim the write slot at the given time; the next caller waits a gap after it."""
+        self._last_write = max(self._last_write, at)
+
+    def record_success(self) -> None:
+        """Write went through: tighten the gap."""
+        # Не сдвигаем назад слот, уже занятый другой лентой
+        self._last_write = max(self._last_write, time.monotonic())
+        self._gap = max(self._min, self._gap * TIGHTEN_FACTOR)
+
+    def record_failure(self) -> None:
+        """Write failed or was dropped: back off."""
+        self._last_write = max(self._last_write, time.monotonic())
+        self._gap = min(self._max, self._gap * BACKOFF_FACTOR + BACKOFF_STEP)
+
+
+def device_pacer() -> WritePacer:
+    """Create a pacer for a single strip."""
+    return WritePacer(DEVICE_INITIAL_GAP, DEVICE_MIN_GAP, DEVICE_MAX_GAP)
+
+
+def async_get_adapter_pacer(hass: HomeAssistant, source: str) -> WritePacer:
+    """Return the pacer shared by all strips behind one adapter/proxy."""
+    pacers: dict[str, WritePacer] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_ADAPTER_PACERS, {}
+    )
+    if source not in pacers:
+        pacers[source] = WritePacer(ADAPTER_INITIAL_GAP, ADAPTER_MIN_GAP, ADAPTER_MAX_GAP)
+    return pacers[source]
+
+
+async def async_wait(*pacers: WritePacer) -> None:
+    """Sleep until every given pacer allows the next write.
+
+    The slot is reserved before sleeping, so strips sharing an adapter pacer
+    are spaced by its gap instead of waking up and writing together.
+    """
+    now = time.monotonic()
+    at = max(now, *(p.ready_at() for p in pacers))
+    for pacer in pacers:
+        pacer.reserve(at)
+    delay = at - now
+    if delay > 0:
+        await asyncio.sleep(delay)
@@ -0,0 +1,90 @@
+"""MELK LED Strip BLE frames (Magic Lantern APK v6.9.6).
+
+Every frame is 9 bytes: 7E [CMD] [SUBCMD] [P1] [P2] [P3] [P4] [P5] EF.
+All frames with a single small parameter are encoded once at import time
+as immutable ``bytes``, so sending them allocates nothing. Only the RGB
+frame is built per call, from a reusable buffer.
+"""
+from __future__ import annotations
+
+
+def _frame(*body: int) -> bytes:
+    return bytes((0x7E, *body, 0xEF))
+
+
+# Включение/выключение: 7E 04 04 [01/00] FF FF FF 00 EF
+TURN_ON_CMD = _frame(0x04, 0x04, 0x01, 0xFF, 0xFF, 0xFF, 0x00)
+TURN_OFF_CMD = _frame(0x04, 0x04, 0x00, 0xFF, 0xFF, 0xFF, 0x00)
+
+# Яркость 0-100 %: 7E 04 01 [BRIGHTNESS] FF FF FF 00 EF
+BRIGHTNESS_FRAMES: tuple[bytes, ...] = tuple(
+    _frame(0x04, 0x01, v, 0xFF, 0xFF, 0xFF, 0x00) for v in range(101)
+)
+
+# Скорость эффекта 0-100: 7E 04 02 [SPEED] FF FF FF 00 EF
+SPEED_FRAMES: tuple[bytes, ...] = tuple(
+    _frame(0x04, 0x02, v, 0xFF, 0xFF, 0xFF, 0x00) for v in range(101)
+)
+
+# Эффекты: 7E 05 03 [EFFECT_ID] 06 FF FF 00 EF (весь байтовый диапазон ID)
+EFFECT_FRAMES: tuple[bytes, ...] = tuple(
+    _frame(0x05, 0x03, v, 0x06, 0xFF, 0xFF, 0x00) for v in range(256)
+)
+
+# Сцены 1-28: 7E 05 31 [SCENE_ID] 07 FF FF 01 EF (индекс 0 не используется)
+SCENE_FRAMES: tuple[bytes, ...] = tuple(
+    _frame(0x05, 0x31, v, 0x07, 0xFF, 0xFF, 0x01) for v in range(29)
+)
+
+# Микрофон вкл/выкл: 7E 04 07 [01/00] FF FF FF 00 EF
+MIC_OFF_CMD = _frame(0x04, 0x07, 0x00, 0xFF, 0xFF, 0xFF, 0x00)
+MIC_ON_CMD = _frame(0x04, 0x07, 0x01, 0xFF, 0xFF, 0xFF, 0x00)
+
+# Чувствительность микрофона 0-100: 7E 04 06 [SENSITIVITY] FF FF FF 00 EF
+MIC_SENSITIVITY_FRAMES: tuple[bytes, ...] = tuple(
+    _frame(0x04, 0x06, v, 0xFF, 0xFF, 0xFF, 0x00) for v in range(101)
+)
+
+# Эквалайзер 0x80-0x87: 7E 07 03 [MODE] 04 FF FF 00 EF
+EQ_FRAMES: dict[int, bytes] = {
+    m: _frame(0x07, 0x03, m, 0x04, 0xFF, 0xFF, 0x00) for m in range(0x80, 0x88)
+}
+
+# RGB: 7E 07 05 03 [R] [G] [B] 10 EF - собирается в переиспользуемом буфере
+_COLOR_BUFFER = bytearray(_frame(0x07, 0x05, 0x03, 0x00, 0x00, 0x00, 0x10))
+
+
+def brightness_frame(percent: int) -> bytes:
+    return BRIGHTNESS_FRAMES[percent]
+
+
+def speed_frame(speed: int) -> bytes:
+    return SPEED_FRAMES[speed]
+
+
+def effect_frame(effect_id: int) -> bytes:
+    return EFFECT_FRAMES[effect_id]
+
+
+def scene_frame(scene_id: int) -> bytes:
+    return SCENE_FRAMES[scene_id]
+
+
+def mic_frame(enabled: bool) -> bytes:
+    return MIC_ON_CMD if enabled else MIC_OFF_CMD
+
+
+def mic_sensitivity_frame(sensitivity: int) -> bytes:
+    return MIC_SENSITIVITY_FRAMES[sensitivity]
+
+
+def eq_frame(mode: int) -> bytes:
+    return EQ_FRAMES[mode]
+
+
+def color_frame(r: int, g: int, b: int) -> bytes:
+    """Build an RGB frame; the only per-call allocation is the result."""
+    _COLOR_BUFFER[4] = r
+    _COLOR_BUFFER[5] = g
+    _COLOR_BUFFER[6] = b
+    return bytes(_COLOR_BUFFER)
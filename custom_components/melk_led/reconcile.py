@@ -0,0 +1,94 @@
+"""Background re-sync of MELK LED strips with their cached state."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_RECONCILER, DOMAIN
+
+if TYPE_CHECKING:
+    from .elkbledom import BLEDOMInstance
+
+LOGGER = logging.getLogger(__name__)
+
+# Пауза между лентами - на всю интеграцию, чтобы не занимать эфир и прокси
+RECONCILE_SPACING = 1.0
+# Лента считается свободной, если столько секунд не было команд
+RECONCILE_QUIET = 5.0
+# Занятую ленту (анимация, очередь) откладываем с нарастающей паузой до этого предела
+RECONCILE_RETRY_MAX = 300.0
+
+
+class MELKLEDReconciler:
+    """Replay cached state to strips one at a time, yielding to user commands."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        # {address: (лента, не раньше чем, сколько раз была занята)};
+        # повторный запрос не добавляет вторую запись
+        self._pending: dict[str, tuple[BLEDOMInstance, float, int]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @callback
+    def async_request(self, instance: BLEDOMInstance) -> None:
+        """Queue a strip for reconciliation."""
+        self._pending.setdefault(instance.address, (instance, 0.0, 0))
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._async_run())
+
+    @callback
+    def async_cancel(self, instance: BLEDOMInstance) -> None:
+        self._pending.pop(instance.address, None)
+
+    async def _async_run(self) -> None:
+        while self._pending:
+            now = time.monotonic()
+            address, (instance, not_before, busy) = min(
+                self._pending.items(), key=lambda item: item[1][1]
+            )
+            if not_before > now:
+                # Спим до ближайшего срока; новый запрос будит раньше
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), not_before - now)
+                continue
+
+            del self._pending[address]
+            if instance.idle_time < RECONCILE_QUIET:
+                # Команды пользователя были недавно - ждём тишины
+                self._pending[address] = (
+                    instance, now + RECONCILE_QUIET - instance.idle_time, busy
+                )
+                continue
+            if not instance.reconcile_ready:
+                delay = min(RECONCILE_RETRY_MAX, RECONCILE_QUIET * 2 ** min(busy, 16))
+                self._pending[address] = (instance, now + delay, busy + 1)
+                continue
+
+            try:
+                frames = await instance.async_reconcile()
+            except Exception as err:  # noqa: BLE001
+                LOGGER.debug("%s: reconciliation failed: %s", instance.name, err)
+            else:
+                LOGGER.debug("%s: reconciled with %d frame(s)", instance.name, frames)
+            await asyncio.sleep(RECONCILE_SPACING)
+
+
+@callback
+def async_get_reconciler(hass: HomeAssistant) -> MELKLEDReconciler:
+    """Return the integration-wide reconciler."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_RECONCILER not in domain_data:
+        domain_data[DATA_RECONCILER] = MELKLEDReconciler(hass)
+    return domain_data[DATA_RECONCILER]
@@ -13,6 +13,10 @@ from .elkbledom import BLEDOMInstance
 
 _LOGGER = logging.getLogger(__name__)
 
+# Соответствие подписей режимам эквалайзера (одно на все сущности)
+LABEL_TO_MODE = {MIC_MODE_LABELS[mode.name]: mode.value for mode in MIC_MODES}
+MODE_TO_LABEL = {value: label for label, value in LABEL_TO_MODE.items()}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -28,20 +32,22 @@ class MELKLEDMicrophoneEQMode(SelectEntity):
     """Microphone EQ mode selector."""
 
     _attr_icon = "mdi:equalizer"
+    _attr_should_poll = False
+    _attr_options = list(LABEL_TO_MODE)
 
     def __init__(self, instance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = instance
         self._attr_name = f"{name} Microphone EQ Mode"
         self._entry_id = entry_id
         self._attr_unique_id = f"{self._instance.address}_mic_eq_mode"
-        
-        # Prepare options list with pretty labels
-        self._attr_options = [MIC_MODE_LABELS[mode.name] for mode in MIC_MODES]
-        self._attr_current_option = MIC_MODE_LABELS["energic"]  # Default
-        
-        # Maps for conversion
-        self._label_to_mode = {MIC_MODE_LABELS[mode.name]: mode.value for mode in MIC_MODES}
-        self._mode_to_label = {mode.value: MIC_MODE_LABELS[mode.name] for mode in MIC_MODES}
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device state changes."""
+        self.async_on_remove(self._instance.async_subscribe(self.async_write_ha_state))
+
+    @property
+    def current_option(self) -> str | None:
+        return MODE_TO_LABEL.get(self._instance.mic_eq_mode)
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -55,8 +61,6 @@ class MELKLEDMicrophoneEQMode(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Select EQ mode."""
-        mode_value = self._label_to_mode.get(option)
+        mode_value = LABEL_TO_MODE.get(option)
         if mode_value is not None:
             await self._instance.set_microphone_eq_mode(mode_value)
-            self._attr_current_option = option
-            self.async_write_ha_state()
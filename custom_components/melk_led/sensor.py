@@ -0,0 +1,218 @@
+"""Sensor platform for MELK LED Strip - connection diagnostics."""
+from __future__ import annotations
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers import device_registry
+
+from .const import DOMAIN
+from .elkbledom import BLEDOMInstance
+
+_LOGGER = logging.getLogger(__name__)
+
+# Диагностика читается из экземпляра, без обращения к ленте
+SCAN_INTERVAL = timedelta(seconds=30)
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MELKLEDSensorEntityDescription(SensorEntityDescription):
+    """Describes a transport metric read from the device instance."""
+
+    value_fn: Callable[[BLEDOMInstance], float | int | None]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+METRIC_SENSORS: tuple[MELKLEDSensorEntityDescription, ...] = (
+    MELKLEDSensorEntityDescription(
+        key="commands_sent",
+        name="Commands sent",
+        icon="mdi:send",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.commands_sent,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="commands_coalesced",
+        name="Commands coalesced",
+        icon="mdi:call-merge",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.coalesced_commands,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="writes_suppressed",
+        name="Writes suppressed",
+        icon="mdi:filter-remove",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.suppressed_writes,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="retries",
+        name="Retries",
+        icon="mdi:reload",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.retried_attempts,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="reconnects",
+        name="Reconnects",
+        icon="mdi:bluetooth-connect",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.reconnects,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="connect_failures",
+        name="Connect failures",
+        icon="mdi:bluetooth-off",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda i: i.connect_failures,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="connect_duration",
+        name="Connect duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda i: _ms(i.last_connect_duration),
+    ),
+    MELKLEDSensorEntityDescription(
+        key="time_connected",
+        name="Time connected",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda i: round(i.connected_time),
+    ),
+    MELKLEDSensorEntityDescription(
+        key="rssi",
+        name="RSSI",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        value_fn=lambda i: i.last_rssi,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="queue_depth",
+        name="Queue depth",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda i: i.queue_depth,
+    ),
+    MELKLEDSensorEntityDescription(
+        key="write_gap",
+        name="Write gap",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda i: _ms(i.write_gap),
+    ),
+    MELKLEDSensorEntityDescription(
+        key="adapter_links",
+        name="Adapter links",
+        icon="mdi:access-point-network",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda i: i.adapter_links,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+):
+    """Set up MELK LED diagnostic sensors."""
+    instance: BLEDOMInstance = hass.data[DOMAIN][entry.entry_id]
+    name = entry.data["name"]
+    entities: list[SensorEntity] = [
+        MELKLEDMetricSensor(instance, name, description) for description in METRIC_SENSORS
+    ]
+    if instance.latency_probe:
+        entities.extend(
+            MELKLEDLatencySensor(instance, name, pct)
+            for pct in LATENCY_PERCENTILES
+        )
+    async_add_entities(entities)
+
+
+class MELKLEDMetricSensor(SensorEntity):
+    """Transport counter or gauge; disabled by default to keep the recorder small."""
+
+    entity_description: MELKLEDSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        instance: BLEDOMInstance,
+        name: str,
+        description: MELKLEDSensorEntityDescription,
+    ) -> None:
+        self._instance = instance
+        self._device_name = name
+        self.entity_description = description
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"{self._instance.address}_{description.key}"
+
+    @property
+    def native_value(self) -> float | int | None:
+        return self.entity_description.value_fn(self._instance)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._instance.address)},
+            name=self._device_name,
+            manufacturer="MELK",
+            model="LED Strip Controller",
+            connections={(device_registry.CONNECTION_NETWORK_MAC, self._instance.address)},
+        )
+
+
+class MELKLEDLatencySensor(SensorEntity):
+    """Rolling percentile of the write-with-response round-trip time."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, instance: BLEDOMInstance, name: str, percentile: int) -> None:
+        self._instance = instance
+        self._device_name = name
+        self._percentile = percentile
+        self._attr_name = f"{name} Latency p{percentile}"
+        self._attr_unique_id = f"{self._instance.address}_latency_p{percentile}"
+
+    @property
+    def native_value(self) -> float | None:
+        return self._instance.latency_percentile(self._percentile)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._instance.address)},
+            name=self._device_name,
+            manufacturer="MELK",
+            model="LED Strip Controller",
+            connections={(device_registry.CONNECTION_NETWORK_MAC, self._instance.address)},
+        )
@@ -0,0 +1,161 @@
+"""Services for MELK LED Strip integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_RGB_COLOR
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry
+
+from .animation import MODES, async_animate
+from .const import DOMAIN
+from .elkbledom import BLEDOMInstance
+from .snapshot import async_capture_snapshot, async_recall_snapshot
+from .storage import async_get_state_store
+from .zone import MELKLEDZone
+
+LOGGER = logging.getLogger(__name__)
+
+SERVICE_WARM_UP = "warm_up"
+ATTR_HOLD = "hold"
+
+SERVICE_ANIMATE = "animate"
+ATTR_MODE = "mode"
+ATTR_DURATION = "duration"
+
+SERVICE_SNAPSHOT_CAPTURE = "snapshot_capture"
+SERVICE_SNAPSHOT_RECALL = "snapshot_recall"
+SERVICE_SNAPSHOT_DELETE = "snapshot_delete"
+
+WARM_UP_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_HOLD): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+    }
+)
+
+ANIMATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_MODE): vol.In(MODES),
+        vol.Required(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+        vol.Optional(ATTR_RGB_COLOR): vol.All(
+            vol.ExactSequence((cv.byte, cv.byte, cv.byte)), vol.Coerce(tuple)
+        ),
+        vol.Optional(ATTR_BRIGHTNESS): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+    }
+)
+
+SNAPSHOT_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_NAME): cv.string,
+    }
+)
+
+SNAPSHOT_RECALL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+SNAPSHOT_DELETE_SCHEMA = vol.Schema({vol.Required(ATTR_NAME): cv.string})
+
+
+@callback
+def async_get_instances(hass: HomeAssistant, entity_ids: list[str]) -> list[BLEDOMInstance]:
+    """Resolve entity ids of this integration to their device instances.
+
+    A zone entity resolves to all of its member strips.
+    """
+    registry = entity_registry.async_get(hass)
+    domain_data = hass.data.get(DOMAIN, {})
+    instances: list[BLEDOMInstance] = []
+    for entity_id in entity_ids:
+        entry = registry.async_get(entity_id)
+        obj = domain_data.get(entry.config_entry_id) if entry else None
+        if isinstance(obj, MELKLEDZone):
+            candidates = obj.instances
+        elif isinstance(obj, BLEDOMInstance):
+            candidates = [obj]
+        else:
+            LOGGER.warning("%s is not a MELK LED entity", entity_id)
+            continue
+        instances.extend(i for i in candidates if i not in instances)
+    return instances
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_WARM_UP):
+        return
+
+    async def _async_warm_up(call: ServiceCall) -> None:
+        """Open links ahead of a scene so the first command is not delayed."""
+        instances = async_get_instances(hass, call.data[ATTR_ENTITY_ID])
+        hold = call.data.get(ATTR_HOLD)
+        results = await asyncio.gather(
+            *(instance.async_warm_up(hold) for instance in instances),
+            return_exceptions=True,
+        )
+        for instance, result in zip(instances, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("%s: warm up failed: %s", instance.name, result)
+
+    async def _async_animate(call: ServiceCall) -> None:
+        """Start a host-rendered transition; returns once it is running."""
+        instances = async_get_instances(hass, call.data[ATTR_ENTITY_ID])
+        # Сначала подключаем все ленты, чтобы переход начался одновременно
+        await asyncio.gather(
+            *(instance.async_warm_up() for instance in instances),
+            return_exceptions=True,
+        )
+        for instance in instances:
+            async_animate(
+                hass,
+                instance,
+                call.data[ATTR_MODE],
+                call.data[ATTR_DURATION],
+                rgb=call.data.get(ATTR_RGB_COLOR),
+                brightness=call.data.get(ATTR_BRIGHTNESS),
+            )
+
+    async def _async_snapshot_capture(call: ServiceCall) -> None:
+        """Remember the current state of the strips under a name."""
+        instances = async_get_instances(hass, call.data[ATTR_ENTITY_ID])
+        async_capture_snapshot(hass, call.data[ATTR_NAME], instances)
+
+    async def _async_snapshot_recall(call: ServiceCall) -> None:
+        """Bring the strips of a snapshot back to it, all at once."""
+        if ATTR_ENTITY_ID in call.data:
+            instances = async_get_instances(hass, call.data[ATTR_ENTITY_ID])
+        else:
+            instances = [
+                obj for obj in hass.data.get(DOMAIN, {}).values() if isinstance(obj, BLEDOMInstance)
+            ]
+        if await async_recall_snapshot(hass, call.data[ATTR_NAME], instances) is None:
+            raise HomeAssistantError(f"Unknown MELK LED snapshot: {call.data[ATTR_NAME]}")
+
+    async def _async_snapshot_delete(call: ServiceCall) -> None:
+        """Forget a stored snapshot."""
+        if not async_get_state_store(hass).async_remove_snapshot(call.data[ATTR_NAME]):
+            raise HomeAssistantError(f"Unknown MELK LED snapshot: {call.data[ATTR_NAME]}")
+
+    hass.services.async_register(DOMAIN, SERVICE_WARM_UP, _async_warm_up, schema=WARM_UP_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_ANIMATE, _async_animate, schema=ANIMATE_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_SNAPSHOT_CAPTURE, _async_snapshot_capture, schema=SNAPSHOT_CAPTURE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SNAPSHOT_RECALL, _async_snapshot_recall, schema=SNAPSHOT_RECALL_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SNAPSHOT_DELETE, _async_snapshot_delete, schema=SNAPSHOT_DELETE_SCHEMA
+    )
@@ -0,0 +1,94 @@
+"""Device state snapshots for MELK LED Strip scenes."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+
+from .storage import async_get_state_store
+
+if TYPE_CHECKING:
+    from .elkbledom import BLEDOMInstance
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceSnapshot:
+    """Everything needed to bring one strip back to a captured look."""
+
+    is_on: bool
+    rgb: tuple[int, int, int]
+    brightness: int
+    # Ключ режима из каталога эффектов ("none" - статичный цвет);
+    # в режиме микрофона - режим, к которому лента вернётся после него
+    effect: str
+    speed: int
+    effect_brightness: int
+    mic_enabled: bool
+    mic_sensitivity: int
+    mic_eq_mode: int
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["rgb"] = list(self.rgb)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DeviceSnapshot:
+        return cls(
+            is_on=bool(data.get("is_on", True)),
+            rgb=tuple(data.get("rgb", (255, 255, 255))),  # type: ignore[arg-type]
+            brightness=int(data.get("brightness", 255)),
+            effect=str(data.get("effect", "none")),
+            speed=int(data.get("speed", 50)),
+            effect_brightness=int(data.get("effect_brightness", 100)),
+            mic_enabled=bool(data.get("mic_enabled", False)),
+            mic_sensitivity=int(data.get("mic_sensitivity", 50)),
+            mic_eq_mode=int(data.get("mic_eq_mode", 0x80)),
+        )
+
+
+def async_capture_snapshot(
+    hass: HomeAssistant, name: str, instances: list[BLEDOMInstance]
+) -> dict[str, DeviceSnapshot]:
+    """Capture the cached state of the strips and store it under name."""
+    snapshots = {instance.address: instance.snapshot() for instance in instances}
+    async_get_state_store(hass).async_set_snapshot(
+        name, {address: snap.as_dict() for address, snap in snapshots.items()}
+    )
+    LOGGER.debug("Captured snapshot %s of %d strip(s)", name, len(snapshots))
+    return snapshots
+
+
+async def async_recall_snapshot(
+    hass: HomeAssistant, name: str, instances: list[BLEDOMInstance]
+) -> int | None:
+    """Apply a stored snapshot to the strips it covers, all in parallel.
+
+    Each strip gets only the frames that differ from its cached state.
+    Returns the total number of frames queued, or None if name is unknown.
+    """
+    stored = async_get_state_store(hass).get_snapshot(name)
+    if stored is None:
+        return None
+    targets = [
+        (instance, DeviceSnapshot.from_dict(stored[instance.address]))
+        for instance in instances
+        if instance.address in stored
+    ]
+    results = await asyncio.gather(
+        *(instance.async_apply_snapshot(snap) for instance, snap in targets),
+        return_exceptions=True,
+    )
+    frames = 0
+    for (instance, _), result in zip(targets, results):
+        if isinstance(result, Exception):
+            LOGGER.warning("%s: failed to recall snapshot %s: %s", instance.name, name, result)
+        else:
+            frames += result
+    LOGGER.debug("Recalled snapshot %s on %d strip(s), %d frame(s)", name, len(targets), frames)
+    return frames
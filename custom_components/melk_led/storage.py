@@ -0,0 +1,153 @@
+"""Shared state persistence for MELK LED Strip devices."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DATA_STATE_STORE
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.devices"
+# Файл старого формата: {address: {...}} без версии
+LEGACY_STATE_FILE_NAME = "melk_led_state.json"
+# Сколько ждём перед записью, чтобы собрать изменения всех устройств
+SAVE_DELAY = 10
+
+
+class _MELKLEDStore(Store[dict[str, Any]]):
+    """Versioned HA store for device state."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Migrate stored data to the current version."""
+        # Версия 1 - текущая; будущие версии добавят шаги сюда
+        return {
+            "devices": old_data.get("devices", {}),
+            "snapshots": old_data.get("snapshots", {}),
+        }
+
+
+class MELKLEDStateStore:
+    """Integration-wide in-memory device state, persisted via HA Store."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._store = _MELKLEDStore(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._devices: dict[str, dict[str, Any]] = {}
+        # Снимки сцен: {имя: {address: состояние}}
+        self._snapshots: dict[str, dict[str, dict[str, Any]]] = {}
+        self._dirty = False
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    # =========================================================
+    # Чтение
+    # =========================================================
+    def _load_legacy_sync(self) -> dict[str, dict[str, Any]]:
+        """Read the pre-Store JSON file, if any (executor)."""
+        path = self._hass.config.path(".storage", LEGACY_STATE_FILE_NAME)
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            LOGGER.warning("Failed to read legacy MELK LED state file: %s", e)
+        return {}
+
+    async def async_load(self) -> None:
+        """Load state once per HA start; later calls return immediately."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load()
+            if data is None:
+                devices = await self._hass.async_add_executor_job(self._load_legacy_sync)
+                if devices:
+                    LOGGER.info("Migrating MELK LED state of %d device(s) to storage", len(devices))
+                    self._dirty = True
+                snapshots = {}
+            else:
+                devices = data.get("devices", {})
+                snapshots = data.get("snapshots", {})
+            # Изменения, сделанные до загрузки, важнее сохранённых данных
+            devices.update(self._devices)
+            self._devices = devices
+            snapshots.update(self._snapshots)
+            self._snapshots = snapshots
+            self._loaded = True
+            if self._dirty:
+                self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get(self, address: str) -> dict[str, Any]:
+        """Return saved state of a device (empty dict if unknown)."""
+        return self._devices.get(address, {})
+
+    def get_snapshot(self, name: str) -> dict[str, dict[str, Any]] | None:
+        """Return a stored snapshot ({address: state}) or None."""
+        return self._snapshots.get(name)
+
+    @property
+    def snapshot_names(self) -> list[str]:
+        return list(self._snapshots)
+
+    # =========================================================
+    # Запись
+    # =========================================================
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._dirty = False
+        return {"devices": self._devices, "snapshots": self._snapshots}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._dirty = True
+        # До загрузки запись откладывается, чтобы не потерять остальные устройства
+        if self._loaded:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_set(self, address: str, payload: dict[str, Any]) -> None:
+        """Update device state and schedule a debounced save."""
+        self._devices[address] = payload
+        self._async_schedule_save()
+
+    @callback
+    def async_set_snapshot(self, name: str, devices: dict[str, dict[str, Any]]) -> None:
+        """Store (or replace) a named snapshot."""
+        self._snapshots[name] = devices
+        self._async_schedule_save()
+
+    @callback
+    def async_remove_snapshot(self, name: str) -> bool:
+        """Forget a named snapshot; False if it did not exist."""
+        if self._snapshots.pop(name, None) is None:
+            return False
+        self._async_schedule_save()
+        return True
+
+    async def async_flush(self) -> None:
+        """Write pending changes now."""
+        if not self._dirty:
+            return
+        await self.async_load()
+        await self._store.async_save(self._data_to_save())
+
+
+@callback
+def async_get_state_store(hass: HomeAssistant) -> MELKLEDStateStore:
+    """Return the integration-wide state store, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STATE_STORE not in domain_data:
+        domain_data[DATA_STATE_STORE] = MELKLEDStateStore(hass)
+    return domain_data[DATA_STATE_STORE]
@@ -0,0 +1,100 @@
+"""Fixed-size command trace for MELK LED Strip diagnostics."""
+from __future__ import annotations
+
+import time
+from array import array
+from collections import deque
+from typing import Any, Hashable
+
+# Сколько последних команд и событий соединения хранится
+TRACE_SIZE = 64
+CONNECTION_HISTORY_SIZE = 32
+
+
+class CommandTrace:
+    """Ring buffer of the last sent commands.
+
+    All slots are preallocated: recording a command only overwrites array
+    items and list references, so the writer path allocates nothing.
+    """
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        self._size = size
+        self._next = 0
+        self._count = 0
+        self._enqueued = array("d", bytes(8 * size))
+        self._started = array("d", bytes(8 * size))
+        self._ended = array("d", bytes(8 * size))
+        self._attempts = array("B", bytes(size))
+        self._ok = array("B", bytes(size))
+        self._frames: list[bytes | None] = [None] * size
+        self._channels: list[Hashable | None] = [None] * size
+
+    def record(
+        self,
+        channel: Hashable,
+        frame: bytes,
+        enqueued: float,
+        started: float,
+        ended: float,
+        attempts: int,
+        ok: bool,
+    ) -> None:
+        i = self._next
+        self._channels[i] = channel
+        self._frames[i] = frame
+        self._enqueued[i] = enqueued
+        self._started[i] = started
+        self._ended[i] = ended
+        self._attempts[i] = min(attempts, 255)
+        self._ok[i] = ok
+        self._next = i + 1 if i + 1 < self._size else 0
+        if self._count < self._size:
+            self._count += 1
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Recorded commands, oldest first, with wall-clock timestamps."""
+        # Монотонное время переводим в настоящее один раз на выгрузку
+        offset = time.time() - time.monotonic()
+        start = (self._next - self._count) % self._size
+        result = []
+        for n in range(self._count):
+            i = (start + n) % self._size
+            channel = self._channels[i]
+            result.append(
+                {
+                    "channel": channel if isinstance(channel, str) else None,
+                    "frame": self._frames[i].hex() if self._frames[i] else None,
+                    "enqueued": round(self._enqueued[i] + offset, 3),
+                    "send_start": round(self._started[i] + offset, 3),
+                    "send_end": round(self._ended[i] + offset, 3),
+                    "queue_ms": round((self._started[i] - self._enqueued[i]) * 1000, 1),
+                    "send_ms": round((self._ended[i] - self._started[i]) * 1000, 1),
+                    "attempts": self._attempts[i],
+                    "ok": bool(self._ok[i]),
+                }
+            )
+        return result
+
+
+class ConnectionHistory:
+    """Last connection events (connect, failure, disconnect)."""
+
+    def __init__(self, size: int = CONNECTION_HISTORY_SIZE) -> None:
+        self._events: deque[tuple[float, str, str | None, float | None]] = deque(maxlen=size)
+
+    def record(
+        self, event: str, source: str | None = None, duration: float | None = None
+    ) -> None:
+        self._events.append((time.time(), event, source, duration))
+
+    def as_list(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "time": round(at, 3),
+                "event": event,
+                "source": source,
+                "duration_ms": None if duration is None else round(duration * 1000, 1),
+            }
+            for at, event, source, duration in self._events
+        ]
@@ -0,0 +1,92 @@
+"""Zones: several MELK LED strips driven as one light."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .animation import async_animate, async_get_animator
+from .const import DOMAIN
+from .elkbledom import BLEDOMInstance
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MELKLEDZone:
+    """Group of strips that receive the same commands concurrently."""
+
+    def __init__(self, hass: HomeAssistant, name: str, members: list[str]) -> None:
+        self._hass = hass
+        self.name = name
+        self.members = list(members)
+
+    @property
+    def instances(self) -> list[BLEDOMInstance]:
+        """Loaded member strips (unloaded or unavailable ones are skipped)."""
+        by_address = {
+            obj.address: obj
+            for obj in self._hass.data.get(DOMAIN, {}).values()
+            if isinstance(obj, BLEDOMInstance)
+        }
+        return [by_address[address] for address in self.members if address in by_address]
+
+    async def async_apply_state(self, **state: Any) -> list[BLEDOMInstance]:
+        """Apply the same state to every member; return the strips that took it.
+
+        Two phases act as a barrier: first every link is opened concurrently,
+        then all frames are queued in the same event loop step, so the writes
+        land together instead of one strip after another.
+        """
+        instances = self.instances
+        if not instances:
+            return []
+        # Новая команда отменяет идущие переходы
+        animator = async_get_animator(self._hass)
+        for instance in instances:
+            animator.async_cancel(instance)
+
+        # Фаза 1: подключаем всех параллельно
+        prepared = await asyncio.gather(
+            *(instance.async_warm_up() for instance in instances),
+            return_exceptions=True,
+        )
+        for instance, result in zip(instances, prepared):
+            if isinstance(result, Exception):
+                LOGGER.debug("%s: zone %s warm up failed: %s", instance.name, self.name, result)
+
+        # Фаза 2: все кадры уходят в очереди одновременно
+        results = await asyncio.gather(
+            *(instance.apply_state(**state) for instance in instances),
+            return_exceptions=True,
+        )
+        applied = []
+        for instance, result in zip(instances, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("%s: zone %s command failed: %s", instance.name, self.name, result)
+            else:
+                applied.append(instance)
+        return applied
+
+    async def async_animate(
+        self,
+        mode: str,
+        duration: float,
+        rgb: tuple[int, int, int] | None = None,
+        brightness: int | None = None,
+        turn_off: bool = False,
+    ) -> list[asyncio.Future]:
+        """Connect every member, then start the same transition on all of them."""
+        await self.async_warm_up()
+        return [
+            async_animate(self._hass, instance, mode, duration, rgb, brightness, turn_off)
+            for instance in self.instances
+        ]
+
+    async def async_warm_up(self, hold: float | None = None) -> None:
+        """Pre-connect every member."""
+        await asyncio.gather(
+            *(instance.async_warm_up(hold) for instance in self.instances),
+            return_exceptions=True,
+        )
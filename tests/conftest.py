@@ -0,0 +1,44 @@
+"""Test setup: load the integration modules without Home Assistant.
+
+The package ``__init__`` imports Home Assistant; the modules under test
+(``const``, ``protocol``, ``effects``, ``effect_tables``) do not, so they are
+imported through a bare package module pointing at the integration folder.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "melk_led"
+PACKAGE = "melk_led"
+
+
+def register_package() -> None:
+    """Register ``melk_led`` as a bare package (skips its ``__init__``)."""
+    if PACKAGE in sys.modules:
+        return
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules[PACKAGE] = package
+
+
+def run_isolated(code: str) -> str:
+    """Run code in a clean interpreter with ``melk_led`` registered; return stdout."""
+    prelude = (
+        "import sys, types\n"
+        f"package = types.ModuleType({PACKAGE!r})\n"
+        f"package.__path__ = [{str(PACKAGE_DIR)!r}]\n"
+        f"sys.modules[{PACKAGE!r}] = package\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", prelude + code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+register_package()
@@ -0,0 +1,71 @@
+"""Microbenchmarks; they report timings and only assert behavior."""
+from __future__ import annotations
+
+import timeit
+
+import pytest
+
+from melk_led import protocol
+from melk_led.effects import _build_catalog
+
+from .conftest import run_isolated
+
+ROUNDS = 100_000
+
+
+def _report(capsys: pytest.CaptureFixture[str], name: str, seconds: float, count: int) -> None:
+    if count > 1:
+        timing = f"{seconds / count * 1e9:.0f} ns/op ({count} ops, {seconds:.3f}s)"
+    else:
+        timing = f"{seconds * 1e3:.2f} ms"
+    with capsys.disabled():
+        print(f"\n{name}: {timing}")
+
+
+def test_frame_builders(capsys: pytest.CaptureFixture[str]) -> None:
+    # Готовые кадры не создаются заново: тот же объект при каждом вызове
+    assert protocol.brightness_frame(50) is protocol.brightness_frame(50)
+    assert protocol.effect_frame(0x87) is protocol.effect_frame(0x87)
+
+    # Как кадры собирались раньше: список -> bytearray на каждый вызов
+    legacy = timeit.timeit(
+        lambda: bytearray([0x7E, 0x04, 0x01, 50, 0xFF, 0xFF, 0xFF, 0x00, 0xEF]),
+        number=ROUNDS,
+    )
+    _report(capsys, "legacy list->bytearray frame", legacy, ROUNDS)
+    _report(
+        capsys,
+        "brightness_frame",
+        timeit.timeit(lambda: protocol.brightness_frame(50), number=ROUNDS),
+        ROUNDS,
+    )
+    _report(
+        capsys,
+        "color_frame",
+        timeit.timeit(lambda: protocol.color_frame(10, 20, 30), number=ROUNDS),
+        ROUNDS,
+    )
+
+
+def test_import_time(capsys: pytest.CaptureFixture[str]) -> None:
+    # Свежий интерпретатор на каждый замер: модули не должны быть в кэше
+    out = run_isolated(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import melk_led.const\n"
+        "lazy = time.perf_counter() - start\n"
+        "start = time.perf_counter()\n"
+        "import melk_led.effect_tables\n"
+        "print(lazy, time.perf_counter() - start)\n"
+    )
+    const_seconds, tables_seconds = (float(value) for value in out.split())
+    _report(capsys, "import const (tables deferred)", const_seconds, 1)
+    _report(capsys, "import effect_tables", tables_seconds, 1)
+
+
+def test_catalog_build(capsys: pytest.CaptureFixture[str]) -> None:
+    # Собираем отдельный каталог, общий из get_effect_catalog() не трогаем
+    start = timeit.default_timer()
+    catalog = _build_catalog()
+    _report(capsys, "build effect catalog", timeit.default_timer() - start, 1)
+    assert len(catalog) == 213 + 28 + 1
@@ -0,0 +1,59 @@
+"""Effect/scene catalog and lazy loading of the effect tables."""
+from __future__ import annotations
+
+from melk_led.effects import (
+    EXPECTED_EFFECTS,
+    EXPECTED_SCENES,
+    KIND_EFFECT,
+    KIND_SCENE,
+    KIND_STATIC,
+    get_effect_catalog,
+)
+from melk_led.protocol import effect_frame, scene_frame
+
+from .conftest import run_isolated
+
+
+def test_self_check() -> None:
+    assert get_effect_catalog().self_check() == []
+
+
+def test_counts() -> None:
+    catalog = get_effect_catalog()
+    assert EXPECTED_EFFECTS == 213
+    assert EXPECTED_SCENES == 28
+    assert catalog.count(KIND_EFFECT) == 213
+    assert catalog.count(KIND_SCENE) == 28
+    assert catalog.count(KIND_STATIC) == 1
+
+
+def test_auto_play() -> None:
+    catalog = get_effect_catalog()
+    entry = catalog.by_id(KIND_EFFECT, 0)
+    assert entry is not None
+    assert entry.key == "auto_play"
+    assert catalog.get("auto_play") is entry
+    assert catalog.from_label(entry.label) is entry
+    assert entry.frame == effect_frame(0)
+
+
+def test_prebuilt_frames() -> None:
+    catalog = get_effect_catalog()
+    for kind, build in ((KIND_EFFECT, effect_frame), (KIND_SCENE, scene_frame)):
+        for entry in catalog.entries:
+            if entry.kind == kind:
+                assert entry.frame == build(entry.id), entry.key
+
+
+def test_catalog_cached() -> None:
+    assert get_effect_catalog() is get_effect_catalog()
+
+
+def test_const_does_not_import_effect_tables() -> None:
+    out = run_isolated(
+        "import melk_led.const\n"
+        "print('melk_led.effect_tables' in sys.modules)\n"
+        "melk_led.const.EFFECTS\n"
+        "print('melk_led.effect_tables' in sys.modules)\n"
+    )
+    assert out.split() == ["False", "True"]
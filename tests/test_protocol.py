@@ -0,0 +1,38 @@
+"""Frame bytes sent to the strip."""
+from __future__ import annotations
+
+import pytest
+
+from melk_led import protocol
+
+
+@pytest.mark.parametrize(
+    ("frame", "expected"),
+    [
+        (protocol.TURN_ON_CMD, "7e040401ffffff00ef"),
+        (protocol.TURN_OFF_CMD, "7e040400ffffff00ef"),
+        (protocol.MIC_ON_CMD, "7e040701ffffff00ef"),
+        (protocol.MIC_OFF_CMD, "7e040700ffffff00ef"),
+        (protocol.brightness_frame(100), "7e040164ffffff00ef"),
+        (protocol.brightness_frame(30), "7e04011effffff00ef"),
+        (protocol.speed_frame(10), "7e04020affffff00ef"),
+        (protocol.effect_frame(0x87), "7e05038706ffff00ef"),
+        (protocol.effect_frame(3), "7e05030306ffff00ef"),
+        (protocol.scene_frame(5), "7e05310507ffff01ef"),
+        (protocol.mic_frame(True), "7e040701ffffff00ef"),
+        (protocol.mic_frame(False), "7e040700ffffff00ef"),
+        (protocol.mic_sensitivity_frame(70), "7e040646ffffff00ef"),
+        (protocol.eq_frame(0x80), "7e07038004ffff00ef"),
+        (protocol.color_frame(1, 2, 3), "7e07050301020310ef"),
+        (protocol.color_frame(255, 0, 128), "7e070503ff008010ef"),
+    ],
+)
+def test_frame_bytes(frame: bytes, expected: str) -> None:
+    assert frame.hex() == expected
+
+
+def test_color_frame_does_not_alias_buffer() -> None:
+    first = protocol.color_frame(10, 20, 30)
+    protocol.color_frame(40, 50, 60)
+    assert first.hex() == "7e0705030a141e10ef"
+    assert isinstance(first, bytes)